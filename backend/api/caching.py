@@ -0,0 +1,160 @@
+import time
+from functools import partial
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers, quote_etag)
+from rest_framework.response import Response
+
+RECIPES_GENERATION = 'recipes'
+
+
+def get_generation(name):
+    """Поколение данных, которое меняется при каждой записи.
+
+    Хранится в кеше Django, общем для воркеров (Redis из REDIS_URL); при
+    пустом кеше начинается с текущего времени, чтобы после перезапуска
+    не совпасть со старым значением.
+    """
+    return cache.get_or_set(f'generation:{name}', time.time_ns, None)
+
+
+async def aget_generation(name):
+    return await cache.aget_or_set(f'generation:{name}', time.time_ns, None)
+
+
+def bump_generation(name):
+    cache.set(f'generation:{name}', time.time_ns(), None)
+
+
+def bump_on_commit(*names):
+    for name in names:
+        transaction.on_commit(partial(bump_generation, name))
+
+
+def get_model_version(model):
+    """Дешёвая версия таблицы: число строк, максимальный id и поколение."""
+    stats = model.objects.aggregate(count=Count('id'), max_id=Max('id'))
+    return (
+        f'{stats["count"]}-{stats["max_id"]}-'
+        f'{get_generation(model._meta.label_lower)}'
+    )
+
+
+async def aget_model_version(model):
+    stats = await model.objects.aaggregate(
+        count=Count('id'), max_id=Max('id')
+    )
+    return (
+        f'{stats["count"]}-{stats["max_id"]}-'
+        f'{await aget_generation(model._meta.label_lower)}'
+    )
+
+
+def get_etag(version, request):
+    """ETag из версии данных и полного пути запроса."""
+    version = f'{version}:{request.get_full_path()}'
+    return quote_etag(md5(version.encode()).hexdigest())
+
+
+def patch_conditional_headers(response, etag):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.REFERENCE_DATA_MAX_AGE
+        )
+        patch_vary_headers(response, ('Accept',))
+    return response
+
+
+def get_response_cache_key(request, name, generation):
+    """Ключ кеша ответа: поколение и нормализованные параметры запроса."""
+    params = sorted(
+        (key, sorted(values)) for key, values in request.GET.lists()
+    )
+    path = f'{request.get_host()}{request.path}?{params}'
+    return f'response:{name}:{generation}:{md5(path.encode()).hexdigest()}'
+
+
+def get_cached_headers(response):
+    """Заголовки ответа, которые нужно вернуть вместе с данными из кеша."""
+    return {
+        header: value for header, value in response.items()
+        if header != 'Content-Type'
+    }
+
+
+class ConditionalGetMixin:
+    """Поддержка If-None-Match для list и retrieve без сериализации данных.
+
+    Наследник задаёт get_data_version(); ETag зависит от версии
+    и полного пути запроса.
+    """
+
+    def get_data_version(self):
+        raise NotImplementedError
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = get_etag(self.get_data_version(), request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return patch_conditional_headers(response, etag)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class AnonymousResponseCacheMixin:
+    """Кеширует list и retrieve для анонимных пользователей.
+
+    Ключ строится из поколения response_cache_generation и нормализованных
+    параметров запроса, поэтому при изменении данных достаточно сменить
+    поколение, не перебирая ключи. Вместе с данными хранятся заголовки,
+    выставленные представлением (например, X-Count-Mode).
+    """
+
+    response_cache_generation = None
+
+    def _get_response_cache_key(self, request):
+        return get_response_cache_key(
+            request, self.response_cache_generation,
+            get_generation(self.response_cache_generation)
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        key = self._get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            return Response(data, headers=headers)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(
+                key, (response.data, get_cached_headers(response)),
+                settings.RESPONSE_CACHE_TIMEOUT
+            )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
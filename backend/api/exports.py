@@ -0,0 +1,46 @@
+import csv
+import json
+
+
+class Echo:
+    """Псевдобуфер для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def shopping_list_txt(rows):
+    yield 'Список покупок:\n\n'
+    for row in rows:
+        yield (
+            f'{row["name"]} ({row["measurement_unit"]}) - '
+            f'{row["total_amount"]}\n'
+        )
+
+
+def shopping_list_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'measurement_unit', 'amount'))
+    for row in rows:
+        yield writer.writerow(
+            (row['name'], row['measurement_unit'], row['total_amount'])
+        )
+
+
+def shopping_list_json(rows):
+    separator = '['
+    for row in rows:
+        yield separator + json.dumps({
+            'name': row['name'],
+            'measurement_unit': row['measurement_unit'],
+            'amount': row['total_amount'],
+        }, ensure_ascii=False)
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+SHOPPING_LIST_FORMATS = {
+    'txt': ('text/plain; charset=utf-8', shopping_list_txt),
+    'csv': ('text/csv; charset=utf-8', shopping_list_csv),
+    'json': ('application/json', shopping_list_json),
+}
@@ -1,16 +1,90 @@
 import base64
+import binascii
+import hashlib
 
+from django.conf import settings
 from django.core.files.base import ContentFile
 from rest_framework import serializers
 
+from api.renditions import RENDITION_FORMATS
+
 
 class Base64ImageField(serializers.ImageField):
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64,')
+            try:
+                format, imgstr = data.split(';base64,')
+                content = base64.b64decode(imgstr)
+            except (ValueError, binascii.Error):
+                self.fail('invalid_image')
             ext = format.split('/')[-1]
-            data = ContentFile(
-                base64.b64decode(imgstr),
-                name='temp.' + ext
-            )
+            data = ContentFile(content, name='temp.' + ext)
         return super().to_internal_value(data)
+
+
+def get_digest(file):
+    digest = hashlib.md5()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.digest()
+
+
+def is_same_file(field_file, uploaded):
+    """Совпадает ли загруженный файл с сохранённым: размер, затем md5."""
+    if not field_file:
+        return False
+    try:
+        if field_file.size != uploaded.size:
+            return False
+        with field_file.storage.open(field_file.name) as stored:
+            return get_digest(stored) == get_digest(uploaded)
+    except OSError:
+        return False
+
+
+class ImageRenditionsField(serializers.Field):
+    """Ссылки на уменьшенные копии изображения.
+
+    Пока копии не готовы, вместо них отдаётся ссылка на оригинал.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        field_file = getattr(instance, self.image_field)
+        if not field_file:
+            return None
+        renditions = getattr(instance, f'{self.image_field}_renditions')
+        if renditions.get('source') != field_file.name:
+            renditions = {}
+        request = self.context.get('request')
+        result = {}
+        for size in settings.IMAGE_RENDITION_SIZES:
+            result[size] = {}
+            for image_format in RENDITION_FORMATS:
+                path = renditions.get(f'{size}.{image_format}')
+                url = field_file.storage.url(path) if path else field_file.url
+                if request:
+                    url = request.build_absolute_uri(url)
+                result[size][image_format] = url
+        return result
+
+
+class RenditionsSerializerMixin:
+    """Отдаёт поля ImageRenditionsField только по запросу ?renditions=1."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request and request.query_params.get('renditions') in (
+            '1', 'true'
+        ):
+            return fields
+        for name, field in list(fields.items()):
+            if isinstance(field, ImageRenditionsField):
+                del fields[name]
+        return fields
@@ -0,0 +1,152 @@
+from itertools import islice
+
+from django.db import transaction
+from rest_framework import serializers
+
+from api.caching import RECIPES_GENERATION, bump_on_commit
+from api.fields import Base64ImageField
+from api.renditions import schedule_renditions
+from api.serializers.recipes import (IngredientInRecipeSerializer,
+                                     validate_relations)
+from recipes.models import (MAX_AMOUNT, MIN_AMOUNT, Ingredient, Recipe,
+                            RecipeIngredient, Tag, get_tags_mask)
+
+
+class RecipeImportSerializer(serializers.ModelSerializer):
+    """Рецепт из пакетной загрузки.
+
+    Теги и ингредиенты проверяются тем же validate_relations, что и при
+    создании рецепта, но по словарям из context, которые загружаются
+    один раз на пачку.
+    """
+
+    image = Base64ImageField()
+    tags = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
+    )
+    ingredients = IngredientInRecipeSerializer(many=True, allow_empty=False)
+    cooking_time = serializers.IntegerField(
+        min_value=MIN_AMOUNT,
+        max_value=MAX_AMOUNT,
+    )
+
+    class Meta:
+        model = Recipe
+        fields = ('name', 'text', 'cooking_time', 'image', 'tags',
+                  'ingredients')
+
+    def validate(self, data):
+        validate_relations(
+            data['tags'],
+            [item['ingredient_id'] for item in data['ingredients']],
+            lambda model, ids: self.context[model]
+        )
+        return data
+
+
+NO_ROW = object()
+ID_FIELD = serializers.IntegerField()
+
+
+def get_int_ids(values):
+    """id, приведённые так же, как их приведёт IntegerField сериализатора."""
+    if not isinstance(values, list):
+        return set()
+    ids = set()
+    for value in values:
+        try:
+            ids.add(ID_FIELD.to_internal_value(value))
+        except serializers.ValidationError:
+            continue
+    return ids
+
+
+def get_lookups(rows):
+    """Все теги и ингредиенты пакета — по одному запросу на модель."""
+    tag_ids, ingredient_ids = set(), set()
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        tag_ids |= get_int_ids(row.get('tags'))
+        ingredients = row.get('ingredients')
+        if isinstance(ingredients, list):
+            ingredient_ids |= get_int_ids([
+                item.get('id') for item in ingredients
+                if isinstance(item, dict)
+            ])
+    return {
+        Tag: Tag.objects.in_bulk(tag_ids),
+        Ingredient: Ingredient.objects.in_bulk(ingredient_ids),
+    }
+
+
+@transaction.atomic
+def save_batch(batch, author):
+    recipes = Recipe.objects.bulk_create([
+        Recipe(
+            author=author,
+            name=data['name'],
+            text=data['text'],
+            cooking_time=data['cooking_time'],
+            image=data['image'],
+            tags_mask=get_tags_mask(data['tags']),
+        )
+        for data in batch
+    ])
+    RecipeIngredient.objects.bulk_create([
+        RecipeIngredient(
+            recipe=recipe,
+            ingredient_id=item['ingredient_id'],
+            amount=item['amount'],
+        )
+        for recipe, data in zip(recipes, batch)
+        for item in data['ingredients']
+    ])
+    Recipe.tags.through.objects.bulk_create([
+        Recipe.tags.through(recipe_id=recipe.id, tag_id=tag_id)
+        for recipe, data in zip(recipes, batch)
+        for tag_id in data['tags']
+    ])
+    for recipe in recipes:
+        schedule_renditions(recipe, 'image')
+    bump_on_commit(RECIPES_GENERATION)
+    return [recipe.id for recipe in recipes]
+
+
+def import_recipes(rows, author, batch_size, max_rows):
+    """Проверяет и сохраняет рецепты пачками по batch_size.
+
+    rows может быть ленивым итератором (NDJSON): из него читается одна
+    пачка за раз, теги и ингредиенты загружаются для каждой пачки.
+    Строки после max_rows не читаются, об этом добавляется ошибка.
+    Возвращает id созданных рецептов и ошибки по номерам строк;
+    ошибка в строке не мешает сохранить остальные.
+    """
+    rows = iter(rows)
+    limited_rows = islice(rows, max_rows)
+    created, errors = [], []
+    start = 0
+    while chunk := list(islice(limited_rows, batch_size)):
+        context = get_lookups(chunk)
+        batch = []
+        for number, row in enumerate(chunk, start):
+            if not isinstance(row, dict):
+                errors.append({
+                    'row': number,
+                    'errors': {'non_field_errors': ['Ожидался JSON-объект']},
+                })
+                continue
+            serializer = RecipeImportSerializer(data=row, context=context)
+            if serializer.is_valid():
+                batch.append(serializer.validated_data)
+            else:
+                errors.append({'row': number, 'errors': serializer.errors})
+        if batch:
+            created.extend(save_batch(batch, author))
+        start += len(chunk)
+    if next(rows, NO_ROW) is not NO_ROW:
+        errors.append({'row': max_rows, 'errors': {'non_field_errors': [
+            f'Не больше {max_rows} рецептов за запрос, остальные строки '
+            'не загружены'
+        ]}})
+    return created, errors
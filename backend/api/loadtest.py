@@ -0,0 +1,359 @@
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+ID_RE = re.compile(r'/\d+(?=/)')
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class HTTPError(Exception):
+    pass
+
+
+class Connection:
+    """Минимальный клиент HTTP/1.1 с keep-alive поверх asyncio."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+        self.request_sent = False
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def _read_body(self, headers):
+        if headers.get('transfer-encoding') == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if not size:
+                    await self.reader.readline()
+                    return b''.join(chunks)
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+        if 'content-length' in headers:
+            return await self.reader.readexactly(
+                int(headers['content-length'])
+            )
+        body = await self.reader.read()
+        await self.close()
+        return body
+
+    async def _send(self, method, path, headers, body):
+        self.request_sent = False
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        lines.append(f'Content-Length: {len(body)}')
+        self.writer.write(
+            ('\r\n'.join(lines) + '\r\n\r\n').encode() + body
+        )
+        await self.writer.drain()
+        self.request_sent = True
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+        response_body = await self._read_body(response_headers)
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, response_body
+
+    async def request(self, method, path, headers, body=b''):
+        """Повторяет запрос один раз, если сервер закрыл keep-alive.
+
+        Неидемпотентный запрос повторяется, только если он не был
+        отправлен: иначе сервер мог его уже выполнить.
+        """
+        try:
+            return await self._send(method, path, headers, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            if self.request_sent and method not in IDEMPOTENT_METHODS:
+                raise
+            return await self._send(method, path, headers, body)
+
+
+class Client:
+    """Соединение виртуального пользователя и сбор замеров."""
+
+    def __init__(self, base_url, stats, token=None):
+        url = urlsplit(base_url)
+        self.prefix = url.path.rstrip('/')
+        self.connection = Connection(url.hostname, url.port or 80)
+        self.stats = stats
+        self.token = token
+
+    async def call(self, method, path, data=None, expected=(200,)):
+        headers = {'Accept': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Token {self.token}'
+        body = b''
+        if data is not None:
+            headers['Content-Type'] = 'application/json'
+            body = json.dumps(data).encode()
+        endpoint = f'{method} {ID_RE.sub("/{id}", path.split("?")[0])}'
+        started = time.perf_counter()
+        try:
+            status, content = await self.connection.request(
+                method, self.prefix + path, headers, body
+            )
+        except (OSError, asyncio.IncompleteReadError, ValueError) as error:
+            self.stats.add(endpoint, time.perf_counter() - started, False)
+            raise HTTPError(f'{endpoint}: {error!r}')
+        self.stats.add(
+            endpoint, time.perf_counter() - started, status in expected
+        )
+        if status not in expected:
+            raise HTTPError(f'{endpoint}: HTTP {status}')
+        if content and content[:1] in (b'{', b'['):
+            return json.loads(content)
+        return content
+
+
+def percentile(values, share):
+    """Процентиль по ближайшему рангу для отсортированного списка."""
+    if not values:
+        return None
+    index = max(0, math.ceil(share * len(values)) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, endpoint, latency, ok):
+        self.latencies[endpoint].append(latency)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    @staticmethod
+    def summarize(latencies, errors, duration):
+        latencies = sorted(latencies)
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'error_rate': round(errors / len(latencies), 4),
+            'rps': round(len(latencies) / duration, 2),
+            **{
+                f'p{share}_ms': round(
+                    percentile(latencies, share / 100) * 1000, 2
+                )
+                for share in (50, 95, 99)
+            },
+        }
+
+    def report(self, duration):
+        endpoints = {
+            endpoint: self.summarize(
+                latencies, self.errors[endpoint], duration
+            )
+            for endpoint, latencies in sorted(self.latencies.items())
+        }
+        all_latencies = [
+            latency for latencies in self.latencies.values()
+            for latency in latencies
+        ]
+        return {
+            'duration_s': round(duration, 3),
+            'total': self.summarize(
+                all_latencies, sum(self.errors.values()), duration
+            ) if all_latencies else {'requests': 0},
+            'endpoints': endpoints,
+        }
+
+
+async def browse_feed(client, context):
+    page = random.randint(1, context['pages'])
+    recipes = await client.call('GET', f'/api/recipes/?page={page}&limit=6')
+    if recipes['results']:
+        recipe = random.choice(recipes['results'])
+        await client.call('GET', f'/api/recipes/{recipe["id"]}/')
+
+
+async def filter_by_tags(client, context):
+    tags = await client.call('GET', '/api/tags/')
+    slugs = random.sample(
+        [tag['slug'] for tag in tags], min(2, len(tags))
+    )
+    query = '&'.join(f'tags={slug}' for slug in slugs)
+    await client.call('GET', f'/api/recipes/?{query}&limit=6')
+
+
+async def autocomplete(client, context):
+    """Набор названия ингредиента по буквам."""
+    name = random.choice(context['ingredient_names'])
+    for length in range(1, min(len(name), 4) + 1):
+        await client.call(
+            'GET', '/api/ingredients/?' + urlencode({'name': name[:length]})
+        )
+
+
+async def favorite(client, context):
+    url = f'/api/recipes/{random.choice(context["recipe_ids"])}/favorite/'
+    await client.call('POST', url, expected=(201, 400))
+    await client.call('DELETE', url, expected=(204, 400))
+
+
+async def shopping_cart(client, context):
+    url = (
+        f'/api/recipes/{random.choice(context["recipe_ids"])}/shopping_cart/'
+    )
+    await client.call('POST', url, expected=(201, 400))
+    await client.call('GET', '/api/recipes/download_shopping_cart/')
+    await client.call('DELETE', url, expected=(204, 400))
+
+
+async def download_list(client, context):
+    await client.call('GET', '/api/recipes/download_shopping_cart/')
+
+
+async def subscribe(client, context):
+    url = f'/api/users/{random.choice(context["author_ids"])}/subscribe/'
+    await client.call('POST', url, expected=(201, 400))
+    await client.call('GET', '/api/users/subscriptions/?recipes_limit=3')
+    await client.call('DELETE', url, expected=(204, 400))
+
+
+SCENARIOS = {
+    'browse_feed': (browse_feed, 5, False),
+    'filter_by_tags': (filter_by_tags, 3, False),
+    'autocomplete': (autocomplete, 3, False),
+    'favorite': (favorite, 2, True),
+    'shopping_cart': (shopping_cart, 1, True),
+    'download_list': (download_list, 1, True),
+    'subscribe': (subscribe, 1, True),
+}
+
+
+async def replay(client, context):
+    """Проигрывает записанные запросы: {"method", "path", "data"}."""
+    for record in context['records']:
+        await client.call(
+            record.get('method', 'GET'), record['path'],
+            record.get('data'), tuple(record.get('expected', (200,)))
+        )
+
+
+async def get_token(base_url, number, password):
+    """Регистрирует пользователя нагрузки, если его ещё нет, и входит."""
+    client = Client(base_url, Stats())
+    email = f'loadtest{number}@example.com'
+    try:
+        await client.call('POST', '/api/users/', {
+            'email': email,
+            'username': f'loadtest{number}',
+            'first_name': 'Load',
+            'last_name': f'Test{number}',
+            'password': password,
+        }, expected=(201, 400))
+        token = await client.call('POST', '/api/auth/token/login/', {
+            'email': email, 'password': password,
+        })
+    finally:
+        await client.connection.close()
+    return token['auth_token']
+
+
+async def prepare(base_url, users, password, records):
+    client = Client(base_url, Stats())
+    try:
+        recipes = await client.call('GET', '/api/recipes/?limit=100')
+    finally:
+        await client.connection.close()
+    context = {
+        'pages': max(1, -(-recipes['count'] // 6)),
+        'recipe_ids': [recipe['id'] for recipe in recipes['results']],
+        'author_ids': list({
+            recipe['author']['id'] for recipe in recipes['results']
+        }),
+        'ingredient_names': list({
+            ingredient['name'] for recipe in recipes['results']
+            for ingredient in recipe['ingredients']
+        }),
+        'records': records,
+    }
+    if not context['recipe_ids'] or not context['ingredient_names']:
+        raise HTTPError('Для нагрузки нужны рецепты')
+    tokens = [
+        await get_token(base_url, number, password)
+        for number in range(users)
+    ]
+    return context, tokens
+
+
+async def run_load(base_url, scenarios, concurrency, duration=None,
+                   requests=None, users=4, password='Qz7-harness-93',
+                   records=None):
+    """Запускает concurrency виртуальных пользователей.
+
+    Каждый в цикле выбирает сценарий с учётом веса, пока не истечёт
+    duration секунд или не будет выполнено requests запросов.
+    Возвращает отчёт с задержками и ошибками по эндпоинтам.
+    """
+    context, tokens = await prepare(base_url, users, password, records)
+    stats = Stats()
+    names = list(scenarios)
+    weights = [SCENARIOS[name][1] for name in names]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def done():
+        total = sum(len(values) for values in stats.latencies.values())
+        return (
+            (deadline is not None and time.perf_counter() >= deadline)
+            or (requests is not None and total >= requests)
+        )
+
+    async def worker(number):
+        token = tokens[number % len(tokens)]
+        client = Client(base_url, stats, token)
+        try:
+            while not done():
+                if records:
+                    scenario = replay
+                else:
+                    name = random.choices(names, weights)[0]
+                    scenario = SCENARIOS[name][0]
+                    client.token = token if SCENARIOS[name][2] else None
+                try:
+                    await scenario(client, context)
+                except HTTPError:
+                    pass
+        finally:
+            await client.connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    report = stats.report(time.perf_counter() - started)
+    report['config'] = {
+        'base_url': base_url,
+        'scenarios': ['replay'] if records else names,
+        'concurrency': concurrency,
+        'duration': duration,
+        'requests': requests,
+    }
+    return report
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.loadtest import SCENARIOS, HTTPError, run_load
+
+PROFILE_ENV = {
+    'wsgi': {'SERVER_PROFILE': 'wsgi', 'ASYNC_READ_VIEWS': 'false'},
+    'asgi': {'SERVER_PROFILE': 'asgi', 'ASYNC_READ_VIEWS': 'true'},
+}
+READ_SCENARIOS = ('browse_feed', 'filter_by_tags', 'autocomplete')
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(process, port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(
+                f'gunicorn завершился с кодом {process.returncode}'
+            )
+        try:
+            socket.create_connection(('127.0.0.1', port), 0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f'gunicorn не начал слушать порт за {timeout} с')
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает gunicorn в профилях wsgi и asgi с одинаковым числом '
+        'воркеров, нагружает каждый одними и теми же сценариями чтения '
+        'и выводит сравнение в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', default=','.join(PROFILE_ENV),
+            help=f'Через запятую: {", ".join(PROFILE_ENV)}'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=2 if settings.REDIS_URL else 1,
+            help='Больше одного воркера — только с общим кешем (REDIS_URL)'
+        )
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--duration', type=float, default=30)
+        parser.add_argument(
+            '--scenarios', default=','.join(READ_SCENARIOS),
+            help=f'Через запятую: {", ".join(SCENARIOS)}'
+        )
+        parser.add_argument(
+            '--startup-timeout', type=float, default=30,
+            help='Сколько секунд ждать, пока gunicorn начнёт слушать порт'
+        )
+        parser.add_argument('--output', help='Записать отчёт в файл')
+        parser.add_argument('--seed', type=int)
+
+    def run_profile(self, profile, options, scenarios):
+        port = get_free_port()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+            cwd=settings.BASE_DIR,
+            env={
+                **os.environ,
+                **PROFILE_ENV[profile],
+                'GUNICORN_BIND': f'127.0.0.1:{port}',
+                'GUNICORN_WORKERS': str(options['workers']),
+            },
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(process, port, options['startup_timeout'])
+            if options['seed'] is not None:
+                random.seed(options['seed'])
+            return asyncio.run(run_load(
+                f'http://127.0.0.1:{port}', scenarios,
+                options['concurrency'], duration=options['duration'],
+                users=1,
+            ))
+        except (HTTPError, OSError) as error:
+            raise CommandError(f'Профиль {profile}: {error}')
+        finally:
+            process.terminate()
+            process.wait()
+
+    def handle(self, *args, **options):
+        profiles = options['profiles'].split(',')
+        scenarios = options['scenarios'].split(',')
+        unknown = (
+            set(profiles) - set(PROFILE_ENV)
+        ) | (set(scenarios) - set(SCENARIOS))
+        if unknown:
+            raise CommandError(
+                f'Неизвестные профили или сценарии: '
+                f'{", ".join(sorted(unknown))}'
+            )
+        reports = {
+            profile: self.run_profile(profile, options, scenarios)
+            for profile in profiles
+        }
+        output = json.dumps({
+            'config': {
+                'workers': options['workers'],
+                'concurrency': options['concurrency'],
+                'duration': options['duration'],
+                'scenarios': scenarios,
+            },
+            'summary': {
+                profile: report['total']
+                for profile, report in reports.items()
+            },
+            'profiles': reports,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        self.stdout.write(output)
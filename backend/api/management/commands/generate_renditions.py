@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from api.renditions import needs_renditions, update_renditions
+from recipes.models import Recipe
+from users.models import User
+
+IMAGE_FIELDS = (
+    (Recipe, 'image'),
+    (User, 'avatar'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Создаёт недостающие уменьшенные копии изображений'
+
+    def handle(self, *args, **options):
+        for model, field_name in IMAGE_FIELDS:
+            created = failed = 0
+            queryset = model.objects.exclude(
+                **{field_name: ''}
+            ).exclude(**{f'{field_name}__isnull': True}).only(
+                'pk', field_name, f'{field_name}_renditions'
+            )
+            for instance in queryset.iterator():
+                if not needs_renditions(instance, field_name):
+                    continue
+                try:
+                    update_renditions(model, instance.pk, field_name)
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(
+                        f'{model.__name__} {instance.pk}: {error}'
+                    )
+                else:
+                    created += 1
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: создано {created}, '
+                f'ошибок {failed}'
+            ))
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.loadtest import SCENARIOS, HTTPError, run_load
+
+
+def read_records(path):
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает запущенный сервер сценариями или записанными запросами '
+        'и выводит задержки и ошибки по эндпоинтам в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default='http://127.0.0.1:8000'
+        )
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument(
+            '--duration', type=float,
+            help='Длительность в секундах (по умолчанию 30)'
+        )
+        parser.add_argument(
+            '--requests', type=int, help='Остановиться после N запросов'
+        )
+        parser.add_argument(
+            '--scenarios', default=','.join(SCENARIOS),
+            help=f'Через запятую: {", ".join(SCENARIOS)}'
+        )
+        parser.add_argument(
+            '--replay',
+            help='NDJSON-файл записанных запросов: {"method", "path", '
+                 '"data", "expected"}'
+        )
+        parser.add_argument(
+            '--users', type=int, default=4,
+            help='Сколько пользователей нагрузки зарегистрировать'
+        )
+        parser.add_argument('--output', help='Записать отчёт в файл')
+        parser.add_argument('--seed', type=int)
+
+    def handle(self, *args, **options):
+        scenarios = options['scenarios'].split(',')
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные сценарии: {", ".join(sorted(unknown))}'
+            )
+        duration = options['duration']
+        if duration is None and options['requests'] is None:
+            duration = 30
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+        try:
+            report = asyncio.run(run_load(
+                options['base_url'], scenarios, options['concurrency'],
+                duration=duration,
+                requests=options['requests'],
+                users=max(1, options['users']),
+                records=(
+                    read_records(options['replay'])
+                    if options['replay'] else None
+                ),
+            ))
+        except (HTTPError, OSError) as error:
+            raise CommandError(f'Не удалось подготовить нагрузку: {error}')
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        self.stdout.write(output)
@@ -0,0 +1,150 @@
+import hashlib
+import runpy
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+from django.urls import get_resolver
+from django.utils.module_loading import import_string
+from gunicorn.app.base import BaseApplication
+
+from recipes.search import ingredient_index
+
+STATIC_HASH_FILE = '.sources.md5'
+STATIC_IGNORE_PATTERNS = ['CVS', '.*', '*~']
+
+
+def get_pending_migrations(using=DEFAULT_DB_ALIAS):
+    """Миграции с диска, которых нет в django_migrations.
+
+    Граф строится без обращения к БД, применённые миграции читаются
+    одним запросом. Сжатая миграция считается применённой, если
+    применены все миграции, которые она заменяет.
+    """
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    try:
+        applied = set(
+            MigrationRecorder.Migration.objects.using(using).values_list(
+                'app', 'name'
+            )
+        )
+    except DatabaseError:
+        applied = set()
+    return sorted(
+        key for key, migration in loader.graph.nodes.items()
+        if key not in applied and not (
+            migration.replaces
+            and all(replaced in applied for replaced in migration.replaces)
+        )
+    )
+
+
+def get_static_hash():
+    """Хеш путей и содержимого всех файлов, которые соберёт collectstatic."""
+    digest = hashlib.md5()
+    for finder in get_finders():
+        files = sorted(
+            finder.list(STATIC_IGNORE_PATTERNS), key=lambda item: item[0]
+        )
+        for path, storage in files:
+            digest.update(path.encode())
+            with storage.open(path) as file:
+                for chunk in iter(lambda: file.read(1 << 16), b''):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+
+class WarmApplication(BaseApplication):
+    """gunicorn с приложением, загруженным в мастере до запуска воркеров.
+
+    Настройки читаются из того же gunicorn.conf.py, что и при запуске
+    gunicorn -c; приложение берётся из его wsgi_app.
+    """
+
+    def __init__(self, config_path):
+        self.config_path = config_path
+        super().__init__()
+
+    def load_config(self):
+        for key, value in runpy.run_path(self.config_path).items():
+            if key in self.cfg.settings:
+                self.cfg.set(key, value)
+        self.cfg.set('preload_app', True)
+
+    def load(self):
+        return import_string(self.cfg.wsgi_app.replace(':', '.'))
+
+
+class Command(BaseCommand):
+    help = (
+        'Применяет новые миграции, собирает изменившуюся статику, '
+        'прогревает приложение и запускает gunicorn. Выводит время '
+        'каждого шага'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-serve', action='store_true',
+            help='Только подготовка, без запуска gunicorn'
+        )
+        parser.add_argument(
+            '--config', default=str(settings.BASE_DIR / 'gunicorn.conf.py'),
+            help='Файл настроек gunicorn'
+        )
+
+    def step(self, name, function):
+        started = time.perf_counter()
+        result = function()
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(f'{name}: {result} ({elapsed:.0f} мс)')
+
+    def migrate(self):
+        pending = get_pending_migrations()
+        if not pending:
+            return 'новых миграций нет, migrate пропущен'
+        call_command('migrate', interactive=False, verbosity=0)
+        return f'применено миграций: {len(pending)}'
+
+    def collectstatic(self):
+        source_hash = get_static_hash()
+        hash_file = Path(settings.STATIC_ROOT) / STATIC_HASH_FILE
+        if hash_file.exists() and hash_file.read_text() == source_hash:
+            return 'статика не изменилась, collectstatic пропущен'
+        call_command('collectstatic', interactive=False, verbosity=0)
+        hash_file.write_text(source_hash)
+        return 'статика собрана'
+
+    def warm_up(self):
+        get_resolver().url_patterns
+        ingredient_index.search('', 1)
+        return 'URL-схема загружена, индекс ингредиентов построен'
+
+    def load_application(self, application):
+        application.wsgi()
+        return (
+            f'{application.cfg.wsgi_app}, воркеров: {application.cfg.workers}'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        self.step('Миграции', self.migrate)
+        self.step('Статика', self.collectstatic)
+        self.step('Прогрев', self.warm_up)
+        application = None
+        if not options['no_serve']:
+            application = WarmApplication(options['config'])
+            self.step(
+                'Приложение', lambda: self.load_application(application)
+            )
+            # Соединения мастера не должны достаться воркерам после fork.
+            connections.close_all()
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(f'Подготовка заняла {elapsed:.0f} мс')
+        if application is not None:
+            application.run()
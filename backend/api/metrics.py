@@ -0,0 +1,256 @@
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+
+TIME_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """Замеры одного запроса: SQL, сериализация, рендеринг, всего."""
+
+    def __init__(self):
+        self.durations = {'db': 0.0, 'serialize': 0.0, 'render': 0.0}
+        self.queries = 0
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.serializing = False
+
+    def add(self, name, duration):
+        self.durations[name] += duration
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def header(self):
+        """Значение заголовка Server-Timing, длительности в мс."""
+        metrics = [
+            f'{name};dur={duration * 1000:.1f}'
+            for name, duration in self.durations.items()
+        ]
+        metrics.append(f'queries;desc="{self.queries}"')
+        metrics.append(f'total;dur={self.total * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+def timed_execute(execute, sql, params, many, context):
+    """Обёртка выполнения SQL, которая ставится на каждое соединение.
+
+    Соединения с БД у потоков свои, а async-представления выполняют ORM
+    в других потоках, поэтому замеры ищутся в contextvar текущего запроса.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.add('db', time.perf_counter() - started)
+
+
+class Histogram:
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.setdefault(
+                labels, [[0] * len(self.buckets), 0.0, 0]
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        """Копия серий процесса: [метки, корзины, сумма, количество]."""
+        with self._lock:
+            return [
+                [list(labels), counts.copy(), total, count]
+                for labels, (counts, total, count) in self._series.items()
+            ]
+
+    def expose(self, snapshots):
+        """Строки Prometheus по сумме серий из снимков всех процессов."""
+        merged = {}
+        for labels, counts, total, count in snapshots:
+            series = merged.setdefault(
+                tuple(labels), [[0] * len(self.buckets), 0.0, 0]
+            )
+            series[0] = [
+                merged_count + bucket_count
+                for merged_count, bucket_count in zip(series[0], counts)
+            ]
+            series[1] += total
+            series[2] += count
+        lines = [
+            f'# HELP {self.name} {self.description}',
+            f'# TYPE {self.name} histogram',
+        ]
+        for labels, (counts, total, count) in sorted(merged.items()):
+            label_text = format_labels(labels)
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="{bound}"}} '
+                    f'{bucket_count}'
+                )
+            lines.append(
+                f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}'
+            )
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+
+def escape_label(value):
+    return (
+        str(value).replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def format_labels(labels):
+    return ','.join(
+        f'{name}="{escape_label(value)}"'
+        for name, value in zip(('route', 'method', 'status'), labels)
+    )
+
+
+HISTOGRAMS = {
+    'total': Histogram(
+        'foodgram_request_duration_seconds',
+        'Время обработки запроса.', TIME_BUCKETS
+    ),
+    'db': Histogram(
+        'foodgram_db_duration_seconds',
+        'Время SQL-запросов за один запрос.', TIME_BUCKETS
+    ),
+    'queries': Histogram(
+        'foodgram_db_queries',
+        'Число SQL-запросов за один запрос.', QUERY_BUCKETS
+    ),
+    'serialize': Histogram(
+        'foodgram_serialize_duration_seconds',
+        'Время сериализации ответа.', TIME_BUCKETS
+    ),
+    'render': Histogram(
+        'foodgram_render_duration_seconds',
+        'Время рендеринга ответа.', TIME_BUCKETS
+    ),
+}
+
+
+_flush_lock = threading.Lock()
+_last_flush = 0.0
+
+
+def observe(route, method, status, timings):
+    labels = (route, method, str(status))
+    HISTOGRAMS['total'].observe(labels, timings.total)
+    HISTOGRAMS['queries'].observe(labels, timings.queries)
+    for name, duration in timings.durations.items():
+        HISTOGRAMS[name].observe(labels, duration)
+    flush()
+
+
+def snapshot():
+    return {
+        name: histogram.snapshot() for name, histogram in HISTOGRAMS.items()
+    }
+
+
+def flush(force=False):
+    """Записывает гистограммы процесса в METRICS_DIR/<pid>.json.
+
+    Без force — не чаще раза в METRICS_FLUSH_INTERVAL секунд. Файл
+    заменяется целиком, поэтому читатели не видят его наполовину
+    записанным.
+    """
+    global _last_flush
+    if not settings.METRICS_DIR:
+        return
+    with _flush_lock:
+        now = time.monotonic()
+        if not force and now - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        _last_flush = now
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}.json'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(snapshot()))
+        os.replace(temporary, path)
+
+
+def clear():
+    """Удаляет снимки прошлого запуска; вызывается мастером gunicorn."""
+    if settings.METRICS_DIR:
+        for path in Path(settings.METRICS_DIR).glob('*.json'):
+            path.unlink(missing_ok=True)
+
+
+def read_snapshots():
+    """Снимки всех воркеров из METRICS_DIR или только этого процесса.
+
+    Файлы завершившихся воркеров остаются, чтобы суммы не уменьшались
+    при их перезапуске.
+    """
+    if not settings.METRICS_DIR:
+        return [snapshot()]
+    flush(force=True)
+    snapshots = []
+    for path in Path(settings.METRICS_DIR).glob('*.json'):
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def expose():
+    """Гистограммы всех воркеров в текстовом формате Prometheus."""
+    snapshots = read_snapshots()
+    lines = []
+    for name, histogram in HISTOGRAMS.items():
+        lines.extend(histogram.expose(
+            series for snapshot in snapshots
+            for series in snapshot.get(name, ())
+        ))
+    return '\n'.join(lines) + '\n'
+
+
+class TimedSerializerMixin:
+    """Добавляет время to_representation к замерам текущего запроса.
+
+    Учитывается только внешний сериализатор: вложенные не считаются
+    второй раз. Ленивые SQL-запросы при сериализации входят и в это
+    время, и во время БД.
+    """
+
+    def to_representation(self, instance):
+        timings = current_timings.get()
+        if timings is None or timings.serializing:
+            return super().to_representation(instance)
+        timings.serializing = True
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timings.serializing = False
+            timings.add('serialize', time.perf_counter() - started)
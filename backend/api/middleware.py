@@ -0,0 +1,108 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from api.metrics import RequestTimings, current_timings, observe
+from api.slow_queries import current_view
+
+
+class ContextMiddleware:
+    """Middleware для sync и async цепочек, которое на время запроса
+    кладёт объект в contextvar; объект изменяемый, поэтому его видят
+    и хуки, выполняемые в других потоках."""
+
+    sync_capable = True
+    async_capable = True
+    context_var = None
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def get_context(self, request):
+        raise NotImplementedError
+
+    def finish(self, request, response, context):
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        context = self.get_context(request)
+        token = self.context_var.set(context)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.context_var.reset(token)
+        return self.finish(request, response, context)
+
+    async def __acall__(self, request):
+        context = self.get_context(request)
+        token = self.context_var.set(context)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.context_var.reset(token)
+        return self.finish(request, response, context)
+
+
+class InstrumentationMiddleware(ContextMiddleware):
+    """Замеряет запрос, отдаёт Server-Timing и копит гистограммы.
+
+    Гистограммы группируются по шаблону маршрута, методу и статусу
+    и хранятся в памяти процесса.
+    """
+
+    context_var = current_timings
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def get_context(self, request):
+        return RequestTimings()
+
+    def finish(self, request, response, timings):
+        timings.finish()
+        response['Server-Timing'] = timings.header()
+        match = request.resolver_match
+        observe(
+            match.route if match else 'unmatched',
+            request.method, response.status_code, timings
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        timings = current_timings.get()
+        started = time.perf_counter()
+
+        def rendered(response):
+            timings.add('render', time.perf_counter() - started)
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class SlowQueryMiddleware(ContextMiddleware):
+    """Подписывает медленные SQL-запросы представлением, которое их
+    выполнило. Включается SLOW_QUERY_LOG_ENABLED."""
+
+    context_var = current_view
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def get_context(self, request):
+        return {}
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current_view.get()['name'] = (
+            f'{request.method} {request.resolver_match.route} '
+            f'({request.resolver_match.view_name})'
+        )
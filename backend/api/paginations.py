@@ -1,6 +1,115 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from api.caching import RECIPES_GENERATION, get_generation
+
+
+# Избранное и список покупок меняются без смены поколения рецептов,
+# поэтому количество с этими фильтрами всегда считается заново.
+PER_USER_FILTERS = ('is_favorited', 'is_in_shopping_cart')
+
+
+def get_count_cache_key(queryset, generation):
+    query = str(queryset.query)
+    return f'count:{generation}:{md5(query.encode()).hexdigest()}'
+
+
+class ExactCountPaginator(Paginator):
+    count_mode = 'exact'
+
+
+class CachedCountPaginator(Paginator):
+    """Кеширует количество по SQL запроса на PAGINATION_COUNT_CACHE_TIMEOUT.
+
+    SQL включает все фильтры, поэтому одинаковые наборы фильтров
+    попадают в один ключ. Запись рецепта меняет поколение и сбрасывает
+    все сохранённые количества.
+    """
+
+    count_mode = 'cached'
+
+    @cached_property
+    def count(self):
+        key = get_count_cache_key(
+            self.object_list, get_generation(RECIPES_GENERATION)
+        )
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count
+
+
+class EstimatedCountPaginator(Paginator):
+    """Берёт оценку планировщика Postgres вместо точного COUNT.
+
+    Оценка используется, только если она больше
+    PAGINATION_COUNT_ESTIMATE_THRESHOLD; на маленьких выборках и на других
+    СУБД считается точное количество.
+    """
+
+    count_mode = 'exact'
+
+    def _estimate(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    @cached_property
+    def count(self):
+        estimate = self._estimate()
+        if (
+            estimate is not None
+            and estimate > settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD
+        ):
+            self.count_mode = 'estimate'
+            return estimate
+        return super().count
+
+
+COUNT_PAGINATORS = {
+    'exact': ExactCountPaginator,
+    'cached': CachedCountPaginator,
+    'estimate': EstimatedCountPaginator,
+}
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+
+    @property
+    def django_paginator_class(self):
+        mode = settings.PAGINATION_COUNT_MODE
+        if mode == 'cached' and any(
+            self.request.query_params.get(name) == '1'
+            for name in PER_USER_FILTERS
+        ):
+            mode = 'exact'
+        return COUNT_PAGINATORS[mode]
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response['X-Count-Mode'] = self.page.paginator.count_mode
+        return response
+
+
+class RecipeCursorPagination(CursorPagination):
+    page_size = 6
+    page_size_query_param = 'limit'
+    ordering = '-id'
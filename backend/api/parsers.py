@@ -0,0 +1,31 @@
+import json
+
+from rest_framework.parsers import BaseParser
+
+
+def parse_lines(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+class NDJSONParser(BaseParser):
+    """Построчный JSON: каждая непустая строка — отдельный объект.
+
+    Возвращает ленивый итератор: строки читаются из тела запроса по мере
+    обработки, и тело целиком в памяти не держится. Строка, которую
+    не удалось разобрать, превращается в None, чтобы ошибка попала
+    в отчёт об этой строке, а не прервала весь запрос.
+    """
+
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        return parse_lines(stream)
@@ -0,0 +1,121 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from api.caching import RECIPES_GENERATION, bump_on_commit
+
+logger = logging.getLogger(__name__)
+
+RENDITION_FORMATS = {
+    'jpeg': 'jpg',
+    'webp': 'webp',
+}
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_RENDITION_WORKERS,
+            thread_name_prefix='renditions'
+        )
+    return _executor
+
+
+def render_image(field_file):
+    """Сохраняет уменьшенные JPEG и WebP копии рядом с оригиналом.
+
+    Возвращает словарь для поля *_renditions: имя исходного файла
+    и пути копий по ключам вида 'small.webp'.
+    """
+    storage = field_file.storage
+    source = PurePosixPath(field_file.name)
+    renditions = {'source': field_file.name}
+    with storage.open(field_file.name, 'rb') as file:
+        with Image.open(file) as original:
+            image = ImageOps.exif_transpose(original).convert('RGB')
+    for size, width in settings.IMAGE_RENDITION_SIZES.items():
+        copy = image.copy()
+        copy.thumbnail((width, width))
+        for image_format, extension in RENDITION_FORMATS.items():
+            buffer = BytesIO()
+            copy.save(
+                buffer, image_format.upper(),
+                quality=settings.IMAGE_RENDITION_QUALITY
+            )
+            path = str(
+                source.parent / 'renditions' / f'{source.stem}_{size}.'
+                f'{extension}'
+            )
+            if storage.exists(path):
+                storage.delete(path)
+            renditions[f'{size}.{image_format}'] = storage.save(
+                path, ContentFile(buffer.getvalue())
+            )
+    return renditions
+
+
+def needs_renditions(instance, field_name):
+    field_file = getattr(instance, field_name)
+    renditions = getattr(instance, f'{field_name}_renditions')
+    return bool(field_file) and renditions.get('source') != field_file.name
+
+
+def update_renditions(model, pk, field_name):
+    """Создаёт копии и сохраняет их, если изображение не сменилось.
+
+    update() не отправляет сигналов, поэтому поколение кеша рецептов
+    (копии видны в рецептах и у их авторов) меняется здесь.
+    """
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not needs_renditions(instance, field_name):
+        return
+    field_file = getattr(instance, field_name)
+    updated = model.objects.filter(
+        pk=pk, **{field_name: field_file.name}
+    ).update(**{f'{field_name}_renditions': render_image(field_file)})
+    if updated:
+        bump_on_commit(RECIPES_GENERATION)
+
+
+def _run(model, pk, field_name):
+    try:
+        update_renditions(model, pk, field_name)
+    except Exception:
+        logger.exception(
+            'Не удалось создать копии %s %s.%s', model.__name__, pk,
+            field_name
+        )
+
+
+def _run_in_thread(model, pk, field_name):
+    try:
+        _run(model, pk, field_name)
+    finally:
+        connections.close_all()
+
+
+def schedule_renditions(instance, field_name):
+    """После коммита ставит создание копий в пул потоков.
+
+    При IMAGE_RENDITION_WORKERS = 0 копии создаются сразу в том же потоке.
+    """
+    if not needs_renditions(instance, field_name):
+        return
+    model, pk = type(instance), instance.pk
+
+    def submit():
+        if settings.IMAGE_RENDITION_WORKERS:
+            _get_executor().submit(_run_in_thread, model, pk, field_name)
+        else:
+            _run(model, pk, field_name)
+
+    transaction.on_commit(submit)
@@ -1,9 +1,16 @@
 from rest_framework import serializers
 
+from api.fields import ImageRenditionsField, RenditionsSerializerMixin
+from api.metrics import TimedSerializerMixin
 from recipes.models import Recipe
 
 
-class RecipeMinifiedSerializer(serializers.ModelSerializer):
+class RecipeMinifiedSerializer(
+    TimedSerializerMixin, RenditionsSerializerMixin,
+    serializers.ModelSerializer
+):
+    image_renditions = ImageRenditionsField('image')
+
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_renditions', 'cooking_time')
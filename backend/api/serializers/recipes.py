@@ -1,23 +1,60 @@
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from rest_framework import serializers
 
-from api.fields import Base64ImageField
+from api.caching import RECIPES_GENERATION, bump_on_commit
+from api.fields import (Base64ImageField, ImageRenditionsField,
+                        RenditionsSerializerMixin, is_same_file)
+from api.metrics import TimedSerializerMixin
 from api.serializers.tags import TagSerializer
 from api.serializers.users import CustomUserSerializer
 from recipes.models import (MAX_AMOUNT, MIN_AMOUNT, Ingredient, Recipe,
-                            RecipeIngredient, Tag)
-
-
-class IngredientSerializer(serializers.ModelSerializer):
+                            RecipeIngredient, ShoppingCartIngredient, Tag)
+
+
+def get_objects_in_bulk(model, ids):
+    return model.objects.in_bulk(ids)
+
+
+def validate_relations(tag_ids, ingredient_ids, get_objects=None):
+    """Проверяет повторы и существование тегов и ингредиентов рецепта.
+
+    get_objects(model, ids) возвращает найденные объекты по id; по
+    умолчанию — один запрос in_bulk на модель. Все недостающие id
+    попадают в одну ошибку. Возвращает словари тегов и ингредиентов.
+    """
+    if len(ingredient_ids) != len(set(ingredient_ids)):
+        raise ValidationError('Повторяющиеся ингридиенты')
+    if len(tag_ids) != len(set(tag_ids)):
+        raise ValidationError('Повторяющиеся теги')
+    get_objects = get_objects or get_objects_in_bulk
+    errors = {}
+    found = []
+    for field, model, ids, message in (
+        ('tags', Tag, tag_ids, 'Несуществующие теги'),
+        ('ingredients', Ingredient, ingredient_ids,
+         'Несуществующие ингредиенты'),
+    ):
+        objects = get_objects(model, ids)
+        missing = [str(pk) for pk in ids if pk not in objects]
+        if missing:
+            errors[field] = f'{message}: {", ".join(missing)}'
+        found.append(objects)
+    if errors:
+        raise ValidationError(errors)
+    return found
+
+
+class IngredientSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
     class Meta:
         model = Ingredient
         fields = '__all__'
 
 
 class IngredientInRecipeSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all()
-    )
+    id = serializers.IntegerField(source='ingredient_id')
     name = serializers.ReadOnlyField(source='ingredient.name')
     measurement_unit = serializers.ReadOnlyField(
         source='ingredient.measurement_unit'
@@ -32,8 +69,26 @@ class IngredientInRecipeSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class ShoppingCartIngredientSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+    id = serializers.ReadOnlyField(source='ingredient.id')
+    name = serializers.ReadOnlyField(source='ingredient.name')
+    measurement_unit = serializers.ReadOnlyField(
+        source='ingredient.measurement_unit'
+    )
+
+    class Meta:
+        model = ShoppingCartIngredient
+        fields = ('id', 'name', 'measurement_unit', 'amount')
+
+
+class RecipeSerializer(
+    TimedSerializerMixin, RenditionsSerializerMixin,
+    serializers.ModelSerializer
+):
     image = Base64ImageField()
+    image_renditions = ImageRenditionsField('image')
     tags = TagSerializer(many=True, read_only=True)
     author = CustomUserSerializer(read_only=True)
     ingredients = IngredientInRecipeSerializer(
@@ -52,7 +107,7 @@ class RecipeSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'tags', 'author', 'ingredients',
             'is_favorited', 'is_in_shopping_cart', 'name',
-            'image', 'text', 'cooking_time',
+            'image', 'image_renditions', 'text', 'cooking_time',
         )
         read_only_fields = (
             'is_favorite',
@@ -61,7 +116,7 @@ class RecipeSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         tags = self.initial_data.get('tags')
-        ingredients = self.initial_data.get('ingredients')
+        ingredients = data.get('recipeingredient_set')
 
         if not tags:
             raise ValidationError(
@@ -72,21 +127,20 @@ class RecipeSerializer(serializers.ModelSerializer):
                 'Нужно добавить минимум один ингредиент'
             )
 
-        if len(ingredients) != len({item['id'] for item in ingredients}):
-            raise ValidationError('Повторяющиеся ингридиенты')
-        if len(tags) != len(set(tags)):
-            raise ValidationError('Повторяющиеся теги')
-
-        for tag in tags:
-            try:
-                tag = Tag.objects.get(id=tag)
-            except Tag.DoesNotExist:
-                raise ValidationError('Несуществующий тег')
-
+        try:
+            tags = [int(tag) for tag in tags]
+        except (TypeError, ValueError):
+            raise ValidationError('Несуществующий тег')
+        tag_objects, ingredient_objects = validate_relations(
+            tags, [item['ingredient_id'] for item in ingredients]
+        )
+        data['tags'] = [tag_objects[pk] for pk in tags]
+        for item in ingredients:
+            item['ingredient'] = ingredient_objects[item['ingredient_id']]
         return data
 
     def _get_data(self, validated_data):
-        tags = self.initial_data.get('tags')
+        tags = validated_data.pop('tags')
         ingredients = validated_data.pop('recipeingredient_set')
         return tags, ingredients
 
@@ -94,12 +148,13 @@ class RecipeSerializer(serializers.ModelSerializer):
         RecipeIngredient.objects.bulk_create([
             RecipeIngredient(
                 recipe=recipe,
-                ingredient=ingredient['id'],
+                ingredient=ingredient['ingredient'],
                 amount=ingredient['amount']
             )
             for ingredient in ingredients
         ])
 
+    @transaction.atomic
     def create(self, validated_data):
         tags, ingredients = self._get_data(validated_data)
         recipe = Recipe.objects.create(**validated_data)
@@ -107,14 +162,78 @@ class RecipeSerializer(serializers.ModelSerializer):
         self._create_ingredients(recipe, ingredients)
         return recipe
 
+    def _update_fields(self, instance, validated_data):
+        """Сохраняет только изменившиеся поля рецепта.
+
+        Картинка приходит новым файлом и сохраняется, только если её
+        содержимое отличается от сохранённого.
+        """
+        changed = [
+            field for field, value in validated_data.items()
+            if (
+                not is_same_file(instance.image, value) if field == 'image'
+                else getattr(instance, field) != value
+            )
+        ]
+        for field in changed:
+            setattr(instance, field, validated_data[field])
+        if changed:
+            instance.save(update_fields=changed)
+
+    def _update_ingredients(self, instance, ingredients):
+        """Вставляет, меняет и удаляет только отличающиеся строки.
+
+        Возвращает изменения количеств по вставленным и изменённым строкам:
+        bulk-операции не посылают сигналов, которые обновляют итоги списков.
+        """
+        current = {
+            item.ingredient_id: item
+            for item in instance.recipeingredient_set.all()
+        }
+        amounts = {
+            item['ingredient_id']: item['amount'] for item in ingredients
+        }
+        deltas = {}
+        removed = [pk for pk in current if pk not in amounts]
+        if removed:
+            # Итоги по удалённым строкам уменьшает сигнал pre_delete.
+            RecipeIngredient.objects.filter(
+                recipe=instance, ingredient_id__in=removed
+            ).delete()
+        changed = []
+        for pk, amount in amounts.items():
+            if pk not in current:
+                deltas[pk] = amount
+            elif current[pk].amount != amount:
+                deltas[pk] = amount - current[pk].amount
+                current[pk].amount = amount
+                changed.append(current[pk])
+        RecipeIngredient.objects.bulk_update(changed, ['amount'])
+        self._create_ingredients(instance, [
+            item for item in ingredients
+            if item['ingredient_id'] not in current
+        ])
+        return deltas
+
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags, ingredients = self._get_data(validated_data)
+        self._update_fields(instance, validated_data)
         instance.tags.set(tags)
-        instance.ingredients.clear()
-        self._create_ingredients(instance, ingredients)
+        deltas = self._update_ingredients(instance, ingredients)
+        if deltas:
+            ShoppingCartIngredient.apply_deltas(
+                list(
+                    instance.shopping_cart.values_list('user_id', flat=True)
+                ),
+                deltas
+            )
+            bump_on_commit(RECIPES_GENERATION)
         return instance
 
-    def _get_is_in_list(self, obj, model_field):
+    def _get_is_in_list(self, obj, model_field, annotation):
+        if hasattr(obj, annotation):
+            return getattr(obj, annotation)
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return getattr(obj, model_field).filter(
@@ -123,7 +242,9 @@ class RecipeSerializer(serializers.ModelSerializer):
         return False
 
     def get_is_favorited(self, obj):
-        return self._get_is_in_list(obj, 'favorites')
+        return self._get_is_in_list(obj, 'favorites', 'is_favorited')
 
     def get_is_in_shopping_cart(self, obj):
-        return self._get_is_in_list(obj, 'shopping_cart')
+        return self._get_is_in_list(
+            obj, 'shopping_cart', 'is_in_shopping_cart'
+        )
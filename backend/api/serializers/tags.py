@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
+from api.metrics import TimedSerializerMixin
+
 from tags.models import Tag
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = '__all__'
@@ -3,10 +3,27 @@ from djoser.serializers import (UserCreateSerializer, UserSerializer,
                                 ValidationError)
 from rest_framework import serializers
 
-from api.fields import Base64ImageField
+from api.fields import (Base64ImageField, ImageRenditionsField,
+                        RenditionsSerializerMixin)
+from api.metrics import TimedSerializerMixin
 from .minifield import RecipeMinifiedSerializer
 
 User = get_user_model()
+RECIPES_LIMIT_ERROR = 'recipes_limit должен быть целым числом больше 0'
+
+
+def get_recipes_limit(request):
+    """recipes_limit из запроса или None; некорректное значение — 400."""
+    recipes_limit = request.query_params.get('recipes_limit')
+    if not recipes_limit:
+        return None
+    try:
+        recipes_limit = int(recipes_limit)
+    except ValueError:
+        raise ValidationError({'recipes_limit': RECIPES_LIMIT_ERROR})
+    if recipes_limit < 1:
+        raise ValidationError({'recipes_limit': RECIPES_LIMIT_ERROR})
+    return recipes_limit
 
 
 class CustomUserCreateSerializer(UserCreateSerializer):
@@ -14,9 +31,12 @@ class CustomUserCreateSerializer(UserCreateSerializer):
     last_name = serializers.CharField(required=True, max_length=150)
 
 
-class CustomUserSerializer(UserSerializer):
+class CustomUserSerializer(
+    TimedSerializerMixin, RenditionsSerializerMixin, UserSerializer
+):
     is_subscribed = serializers.SerializerMethodField()
     avatar = serializers.SerializerMethodField(default=None)
+    avatar_renditions = ImageRenditionsField('avatar')
 
     class Meta:
         model = User
@@ -27,13 +47,17 @@ class CustomUserSerializer(UserSerializer):
             'last_name',
             'email',
             'is_subscribed',
-            'avatar'
+            'avatar',
+            'avatar_renditions'
         )
 
     def get_is_subscribed(self, obj):
-        if obj:
-            return obj.subscribers.filter(user=obj).exists()
-        return False
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+        request = self.context.get('request')
+        if not request or not request.user.is_authenticated:
+            return False
+        return obj.subscribers.filter(user=request.user).exists()
 
     def get_avatar(self, obj):
         if obj.avatar:
@@ -55,6 +79,7 @@ class SubscriptionSerializer(CustomUserSerializer):
             'email',
             'is_subscribed',
             'avatar',
+            'avatar_renditions',
             'recipes',
             'recipes_count'
         )
@@ -65,6 +90,8 @@ class SubscriptionSerializer(CustomUserSerializer):
         author = self.instance
         user = request.user
         method = request.method
+        if method == 'POST':
+            get_recipes_limit(request)
         subscription_exists = author.subscribers.filter(user=user).exists()
 
         if method == 'POST':
@@ -83,12 +110,13 @@ class SubscriptionSerializer(CustomUserSerializer):
         return data
 
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        recipes_limit = request.query_params.get('recipes_limit')
+        recipes_limit = get_recipes_limit(self.context.get('request'))
         recipes = obj.recipes.all()
         if recipes_limit:
-            recipes = recipes[:int(recipes_limit)]
-        return RecipeMinifiedSerializer(recipes, many=True).data
+            recipes = recipes[:recipes_limit]
+        return RecipeMinifiedSerializer(
+            recipes, many=True, context=self.context
+        ).data
 
 
 class AvatarSerializer(serializers.ModelSerializer):
@@ -0,0 +1,162 @@
+import atexit
+import threading
+import time
+from collections import Counter, OrderedDict
+from hashlib import sha256
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Case, F, When
+
+from api.caching import aget_generation, get_generation
+from recipes.models import Recipe
+
+ALPHABET = (
+    '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+)
+BASE = len(ALPHABET)
+ID_BITS = 40
+ID_MASK = (1 << ID_BITS) - 1
+MULTIPLIER = 0x5DEECE66D
+INVERSE = pow(MULTIPLIER, -1, 1 << ID_BITS)
+# Меняется при удалении рецепта в любом воркере; записи LRU
+# с другим поколением перепроверяются по БД.
+SHORT_LINKS_GENERATION = 'short_links'
+
+
+def _get_salt():
+    digest = sha256(f'short-link:{settings.SECRET_KEY}'.encode()).digest()
+    return int.from_bytes(digest[:8], 'big') & ID_MASK
+
+
+def encode(recipe_id):
+    """Обратимо перемешивает id рецепта и записывает его в base62."""
+    number = ((recipe_id * MULTIPLIER) & ID_MASK) ^ _get_salt()
+    code = ''
+    while True:
+        number, remainder = divmod(number, BASE)
+        code = ALPHABET[remainder] + code
+        if not number:
+            return code
+
+
+def decode(code):
+    number = 0
+    for char in code:
+        index = ALPHABET.find(char)
+        if index < 0:
+            return None
+        number = number * BASE + index
+    if number > ID_MASK:
+        return None
+    return ((number ^ _get_salt()) * INVERSE) & ID_MASK
+
+
+class LRUCache:
+    def __init__(self, size):
+        self.size = size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class HitCounter:
+    """Копит переходы по ссылкам и записывает их в БД пачками.
+
+    Сброс происходит при SHORT_LINK_FLUSH_SIZE накопленных переходах,
+    раз в SHORT_LINK_FLUSH_INTERVAL секунд и при завершении процесса.
+    """
+
+    def __init__(self):
+        self._hits = Counter()
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+
+    def _add(self, recipe_id):
+        """Учитывает переход и сообщает, пора ли сбросить счётчики."""
+        with self._lock:
+            self._hits[recipe_id] += 1
+            pending = sum(self._hits.values())
+        return (
+            pending >= settings.SHORT_LINK_FLUSH_SIZE
+            or time.monotonic() - self._flushed_at
+            >= settings.SHORT_LINK_FLUSH_INTERVAL
+        )
+
+    def hit(self, recipe_id):
+        if self._add(recipe_id):
+            self.flush()
+
+    async def ahit(self, recipe_id):
+        if self._add(recipe_id):
+            await sync_to_async(self.flush)()
+
+    def flush(self):
+        with self._lock:
+            hits, self._hits = self._hits, Counter()
+            self._flushed_at = time.monotonic()
+        if not hits:
+            return
+        Recipe.objects.filter(pk__in=hits).update(
+            short_link_hits=F('short_link_hits') + Case(
+                *(When(pk=pk, then=count) for pk, count in hits.items())
+            )
+        )
+
+
+recipe_ids = LRUCache(settings.SHORT_LINK_CACHE_SIZE)
+hit_counter = HitCounter()
+atexit.register(hit_counter.flush)
+
+
+def resolve(code):
+    """Id существующего рецепта по коду или None.
+
+    LRU процесса хранит id вместе с поколением SHORT_LINKS_GENERATION
+    из общего кеша, поэтому удаление рецепта в другом воркере
+    не оставляет рабочей ссылки.
+    """
+    generation = get_generation(SHORT_LINKS_GENERATION)
+    cached = recipe_ids.get(code)
+    if cached is not None and cached[1] == generation:
+        return cached[0]
+    recipe_id = decode(code)
+    if recipe_id is None or not Recipe.objects.filter(pk=recipe_id).exists():
+        return None
+    recipe_ids.set(code, (recipe_id, generation))
+    return recipe_id
+
+
+async def aresolve(code):
+    generation = await aget_generation(SHORT_LINKS_GENERATION)
+    cached = recipe_ids.get(code)
+    if cached is not None and cached[1] == generation:
+        return cached[0]
+    recipe_id = decode(code)
+    if recipe_id is None or not await Recipe.objects.filter(
+        pk=recipe_id
+    ).aexists():
+        return None
+    recipe_ids.set(code, (recipe_id, generation))
+    return recipe_id
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.caching import RECIPES_GENERATION, bump_on_commit
+from api.metrics import timed_execute
+from api.renditions import schedule_renditions
+from api.shortlinks import SHORT_LINKS_GENERATION, encode, recipe_ids
+from api.slow_queries import recorder
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from tags.models import Tag
+
+User = get_user_model()
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def bump_tag_generation(sender, **kwargs):
+    bump_on_commit(sender._meta.label_lower, RECIPES_GENERATION)
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+@receiver((post_save, post_delete), sender=Ingredient)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def bump_recipes_generation(**kwargs):
+    bump_on_commit(RECIPES_GENERATION)
+
+
+@receiver((post_save, post_delete), sender=User)
+def bump_recipes_generation_on_author_change(update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    bump_on_commit(RECIPES_GENERATION)
+
+
+@receiver(post_save, sender=Recipe)
+def schedule_recipe_image_renditions(instance, **kwargs):
+    schedule_renditions(instance, 'image')
+
+
+@receiver(post_save, sender=User)
+def schedule_avatar_renditions(instance, **kwargs):
+    schedule_renditions(instance, 'avatar')
+
+
+@receiver(post_delete, sender=Recipe)
+def forget_short_link(instance, **kwargs):
+    recipe_ids.delete(encode(instance.pk))
+    bump_on_commit(SHORT_LINKS_GENERATION)
+
+
+@receiver(connection_created)
+def install_execute_wrappers(connection, **kwargs):
+    if timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.extend((timed_execute, recorder))
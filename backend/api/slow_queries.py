@@ -0,0 +1,106 @@
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+logger = logging.getLogger('api.slow_queries')
+current_view = ContextVar('current_view', default=None)
+
+
+INSTRUMENTATION_FILES = {
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ('metrics.py', 'middleware.py', 'slow_queries.py')
+}
+
+
+def get_origin_frame():
+    """Ближайший к запросу кадр стека из кода проекта."""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-1]):
+        if (
+            frame.filename.startswith(base_dir)
+            and 'site-packages' not in frame.filename
+            and frame.filename not in INSTRUMENTATION_FILES
+        ):
+            return f'{frame.filename}:{frame.lineno} in {frame.name}'
+    return None
+
+
+class SlowQueryRecorder:
+    """Сохраняет запросы дольше SLOW_QUERY_THRESHOLD_MS.
+
+    Для SELECT дополнительно снимается план: EXPLAIN QUERY PLAN
+    на SQLite, EXPLAIN (или EXPLAIN ANALYZE при SLOW_QUERY_EXPLAIN_ANALYZE)
+    на PostgreSQL. Записи попадают в кольцевой буфер процесса
+    и в лог api.slow_queries. Запросы учитываются только внутри
+    SlowQueryMiddleware, которое кладёт в current_view словарь
+    с именем представления.
+    """
+
+    def __init__(self, size):
+        self.records = deque(maxlen=size)
+        self._local = threading.local()
+
+    def __call__(self, execute, sql, params, many, context):
+        if current_view.get() is None or getattr(
+            self._local, 'explaining', False
+        ):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = (time.perf_counter() - started) * 1000
+        if duration >= settings.SLOW_QUERY_THRESHOLD_MS:
+            self.record(context['connection'], sql, params, many, duration)
+        return result
+
+    def explain(self, connection, sql, params):
+        if connection.vendor == 'postgresql':
+            prefix = (
+                'EXPLAIN ANALYZE' if settings.SLOW_QUERY_EXPLAIN_ANALYZE
+                else 'EXPLAIN'
+            )
+        elif connection.vendor == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN'
+        else:
+            return None
+        self._local.explaining = True
+        try:
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    cursor.execute(f'{prefix} {sql}', params)
+                    return '\n'.join(
+                        ' '.join(str(column) for column in row)
+                        for row in cursor.fetchall()
+                    )
+        except DatabaseError as error:
+            return f'EXPLAIN не выполнен: {error}'
+        finally:
+            self._local.explaining = False
+
+    def record(self, connection, sql, params, many, duration):
+        explainable = not many and sql.lstrip()[:6].upper() == 'SELECT'
+        record = {
+            'time': timezone.now().isoformat(),
+            'duration_ms': round(duration, 2),
+            'sql': sql,
+            'params': repr(params),
+            'view': current_view.get().get('name'),
+            'frame': get_origin_frame(),
+            'plan': (
+                self.explain(connection, sql, params) if explainable
+                else None
+            ),
+        }
+        self.records.append(record)
+        logger.warning(json.dumps(record, ensure_ascii=False))
+
+
+recorder = SlowQueryRecorder(settings.SLOW_QUERY_BUFFER_SIZE)
@@ -0,0 +1,155 @@
+import base64
+import shutil
+import tempfile
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APITestCase
+
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart)
+from recipes.search import ingredient_index
+from tags.models import Tag
+from users.models import Subscription, User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+IMAGE_BASE64 = 'data:image/gif;base64,' + base64.b64encode(SMALL_GIF).decode()
+
+USERS_COUNT = 8
+TAGS_COUNT = 3
+INGREDIENTS_COUNT = 60
+RECIPES_PER_USER = 6
+INGREDIENTS_PER_RECIPE = 5
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    IMAGE_RENDITION_WORKERS=0,
+    METRICS_DIR='',
+)
+class FoodgramAPITestCase(APITestCase):
+    """Общий набор данных и проверки бюджета запросов для тестов API."""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                email=f'user{i}@foodgram.ru',
+                username=f'user{i}',
+                first_name=f'Имя{i}',
+                last_name=f'Фамилия{i}',
+                password='Pa55w0rd!',
+            )
+            for i in range(USERS_COUNT)
+        ]
+        cls.user = cls.users[0]
+        cls.tags = [
+            Tag.objects.create(name=f'Тег {i}', slug=f'tag{i}')
+            for i in range(TAGS_COUNT)
+        ]
+        cls.ingredients = Ingredient.objects.bulk_create([
+            Ingredient(name=f'ингредиент {i:03}', measurement_unit='г')
+            for i in range(INGREDIENTS_COUNT)
+        ])
+        cls.recipes = []
+        for author_index, author in enumerate(cls.users):
+            for i in range(RECIPES_PER_USER):
+                recipe = Recipe.objects.create(
+                    author=author,
+                    name=f'Рецепт {author_index}-{i}',
+                    image='recipes/images/test.gif',
+                    text='Описание',
+                    cooking_time=10 + i,
+                )
+                recipe.tags.set(cls.tags[:i % TAGS_COUNT + 1])
+                offset = (author_index + i) % (
+                    INGREDIENTS_COUNT - INGREDIENTS_PER_RECIPE
+                )
+                RecipeIngredient.objects.bulk_create([
+                    RecipeIngredient(
+                        recipe=recipe, ingredient=ingredient, amount=i + 1
+                    )
+                    for ingredient in cls.ingredients[
+                        offset:offset + INGREDIENTS_PER_RECIPE
+                    ]
+                ])
+                cls.recipes.append(recipe)
+        for recipe in cls.recipes[::2]:
+            Favorite.objects.create(user=cls.user, recipe=recipe)
+        for recipe in cls.recipes[::3]:
+            ShoppingCart.add(cls.user, recipe)
+        for author in cls.users[1:]:
+            Subscription.objects.create(user=cls.user, author=author)
+
+    def setUp(self):
+        cache.clear()
+        ingredient_index.invalidate()
+        self.anon_client = APIClient()
+        self.auth_client = self.client_for(self.user)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def request(self, client, method, url, data=None, status_code=200):
+        """Выполняет запрос и возвращает ответ и число SQL-запросов."""
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data, format='json')
+            if response.streaming:
+                response.streaming_content = list(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        self.assertEqual(
+            response.status_code, status_code,
+            f'{method.upper()} {url}: {getattr(response, "data", "")}'
+        )
+        return response, len(queries), elapsed
+
+    def assertBudget(self, client, method, url, max_queries, max_seconds,
+                     data=None, status_code=200):
+        response, queries, elapsed = self.request(
+            client, method, url, data, status_code
+        )
+        self.assertLessEqual(
+            queries, max_queries,
+            f'{method.upper()} {url}: {queries} SQL-запросов, '
+            f'бюджет {max_queries}'
+        )
+        self.assertLessEqual(
+            elapsed, max_seconds,
+            f'{method.upper()} {url}: {elapsed:.3f} с, '
+            f'бюджет {max_seconds} с'
+        )
+        return response, queries
+
+    def assertFlatQueries(self, client, url, page_sizes, max_queries,
+                          max_seconds):
+        """Число запросов не должно зависеть от размера страницы."""
+        separator = '&' if '?' in url else '?'
+        counts = {}
+        for page_size in page_sizes:
+            page_url = f'{url}{separator}limit={page_size}'
+            counts[page_size] = self.assertBudget(
+                client, 'get', page_url, max_queries, max_seconds
+            )[1]
+        self.assertEqual(
+            len(set(counts.values())), 1,
+            f'GET {url}: число запросов зависит от размера страницы '
+            f'{counts}'
+        )
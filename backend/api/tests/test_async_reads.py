@@ -0,0 +1,110 @@
+from urllib.parse import urlencode
+
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+
+from api.shortlinks import encode, hit_counter, recipe_ids
+from api.tests.base import FoodgramAPITestCase
+
+ASGI_URLCONF = 'foodgram_backend.asgi_urls'
+
+
+class AsyncReadViewsTest(FoodgramAPITestCase):
+    """Async-версии чтений отдают то же, что sync DRF."""
+
+    def setUp(self):
+        super().setUp()
+        recipe_ids.clear()
+
+    def tearDown(self):
+        hit_counter.flush()
+        super().tearDown()
+
+    def async_request(self, method, url, **kwargs):
+        async def request():
+            return await getattr(self.async_client, method)(url, **kwargs)
+
+        with override_settings(ROOT_URLCONF=ASGI_URLCONF):
+            return async_to_sync(request)()
+
+    def async_get(self, url, headers=None):
+        return self.async_request('get', url, headers=headers)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_responses_match_sync_views(self):
+        recipe = self.recipes[-1]
+        urls = (
+            '/api/tags/',
+            '/api/ingredients/?' + urlencode({'name': 'ингредиент 00'}),
+            '/api/ingredients/?' + urlencode(
+                {'name': 'ингредент', 'match': 'fuzzy'}
+            ),
+            '/api/recipes/',
+            '/api/recipes/?page=2&limit=4',
+            '/api/recipes/?page=last&limit=5',
+            f'/api/recipes/?tags={self.tags[2].slug}&tags={self.tags[1].slug}',
+            f'/api/recipes/?author={recipe.author_id}&'
+            + urlencode({'search': 'Рецепт'}),
+            f'/api/recipes/{recipe.id}/',
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                expected = self.anon_client.get(url)
+                response = self.async_get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn('Allow', response)
+                self.assertEqual(response.json(), expected.json())
+                self.assertEqual(
+                    response.get('ETag'), expected.get('ETag')
+                )
+                self.assertEqual(
+                    response.get('X-Count-Mode'),
+                    expected.get('X-Count-Mode')
+                )
+
+    def test_cached_recipe_list_is_shared_with_sync_views(self):
+        expected = self.anon_client.get('/api/recipes/?limit=3').json()
+        with self.assertNumQueries(0):
+            response = self.async_get('/api/recipes/?limit=3')
+        self.assertEqual(response.json(), expected)
+
+    @override_settings(PAGINATION_COUNT_MODE='cached')
+    def test_count_mode_header_on_cache_hit(self):
+        for _ in range(2):
+            response = self.async_get('/api/recipes/?limit=3')
+            self.assertEqual(response['X-Count-Mode'], 'cached')
+        self.assertEqual(
+            self.anon_client.get('/api/recipes/?limit=3')['X-Count-Mode'],
+            'cached'
+        )
+
+    def test_not_modified(self):
+        etag = self.async_get('/api/tags/')['ETag']
+        response = self.async_get(
+            '/api/tags/', headers={'If-None-Match': etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_other_requests_fall_back_to_sync_views(self):
+        token = Token.objects.create(user=self.user)
+        recipe = self.recipes[0]
+        response = self.async_get(
+            f'/api/recipes/{recipe.id}/',
+            headers={'Authorization': f'Token {token.key}'}
+        )
+        self.assertIn('Allow', response)
+        self.assertTrue(response.json()['is_favorited'])
+        for url in ('/api/recipes/?page=999', '/api/recipes/0/'):
+            self.assertEqual(self.async_get(url).status_code, 404)
+        response = self.async_request(
+            'post', '/api/recipes/', data={}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_short_link_redirect(self):
+        recipe = self.recipes[0]
+        response = self.async_get(f'/s/{encode(recipe.id)}/')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], f'/recipes/{recipe.id}/')
+        self.assertEqual(self.async_get('/s/zzzzzzzzzz/').status_code, 404)
@@ -0,0 +1,73 @@
+from api.caching import bump_generation
+from api.tests.base import FoodgramAPITestCase
+from recipes.models import Ingredient
+from tags.models import Tag
+
+
+class ConditionalGetTest(FoodgramAPITestCase):
+
+    def assertNotModified(self, url):
+        response = self.anon_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('max-age=', response['Cache-Control'])
+        self.assertIn('public', response['Cache-Control'])
+        etag = response['ETag']
+        response = self.anon_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        return etag
+
+    def assertModified(self, url, etag):
+        response = self.anon_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_tags(self):
+        tag = self.tags[0]
+        for url in ('/api/tags/', f'/api/tags/{tag.id}/'):
+            etag = self.assertNotModified(url)
+            with self.captureOnCommitCallbacks(execute=True):
+                tag.name = f'{tag.name}!'
+                tag.save()
+            self.assertModified(url, etag)
+        etag = self.assertNotModified('/api/tags/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='Новый', slug='new')
+        self.assertModified('/api/tags/', etag)
+
+    def test_tags_see_generation_bumped_elsewhere(self):
+        etag = self.assertNotModified('/api/tags/')
+        # Так выглядит запись тега в другом воркере: меняется только
+        # поколение в общем кеше.
+        bump_generation(Tag._meta.label_lower)
+        self.assertModified('/api/tags/', etag)
+
+    def test_tags_not_modified_skips_serialization(self):
+        etag = self.anon_client.get('/api/tags/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.anon_client.get(
+                '/api/tags/', HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_ingredients(self):
+        ingredient = self.ingredients[0]
+        for url in (
+            '/api/ingredients/?name=ингр',
+            f'/api/ingredients/{ingredient.id}/',
+        ):
+            etag = self.assertNotModified(url)
+            ingredient.measurement_unit += '!'
+            with self.captureOnCommitCallbacks(execute=True):
+                ingredient.save()
+            self.assertModified(url, etag)
+        etag = self.assertNotModified('/api/ingredients/?name=ингр')
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(name='ингр', measurement_unit='г')
+        self.assertModified('/api/ingredients/?name=ингр', etag)
+
+    def test_etag_depends_on_query(self):
+        self.assertNotEqual(
+            self.anon_client.get('/api/ingredients/?name=а')['ETag'],
+            self.anon_client.get('/api/ingredients/?name=б')['ETag'],
+        )
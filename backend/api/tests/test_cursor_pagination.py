@@ -0,0 +1,43 @@
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.tests.base import FoodgramAPITestCase
+
+
+class RecipeCursorPaginationTest(FoodgramAPITestCase):
+
+    def walk(self, client, query):
+        url = f'/api/recipes/?{query}&cursor=&limit=5'
+        ids = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            for sql in (item['sql'].upper() for item in queries):
+                self.assertNotIn('COUNT(', sql)
+                self.assertNotIn('OFFSET', sql)
+            ids.extend(recipe['id'] for recipe in response.data['results'])
+            url = response.data['next']
+            if url:
+                parts = urlsplit(url)
+                url = f'{parts.path}?{parts.query}'
+        return ids
+
+    def expected(self, client, query):
+        response = client.get(f'/api/recipes/?{query}&limit=1000')
+        return [recipe['id'] for recipe in response.data['results']]
+
+    def test_matches_page_number_results(self):
+        for client, query in (
+            (self.anon_client, ''),
+            (self.anon_client, 'tags=tag0&tags=tag2'),
+            (self.anon_client, f'author={self.users[2].id}'),
+            (self.auth_client, 'is_favorited=1'),
+            (self.auth_client, 'is_in_shopping_cart=1&tags=tag1'),
+        ):
+            ids = self.walk(client, query)
+            self.assertEqual(ids, self.expected(client, query), query)
+            self.assertEqual(len(ids), len(set(ids)))
@@ -0,0 +1,118 @@
+from django.test import override_settings
+
+from api.tests.base import FoodgramAPITestCase
+from recipes.models import Ingredient
+from recipes.search import ingredient_index
+
+
+class IngredientPrefixIndexTest(FoodgramAPITestCase):
+
+    def test_matches_startswith_filter(self):
+        for prefix in ('', 'инг', 'ингредиент 00', 'ингредиент 059', 'нет'):
+            expected = list(
+                Ingredient.objects.filter(name__startswith=prefix)
+                .order_by('name', 'id')
+                .values_list('id', flat=True)[:50]
+            )
+            found = [item['id'] for item in ingredient_index.search(prefix)]
+            self.assertEqual(found, expected, prefix)
+
+    def test_exact_match_first(self):
+        Ingredient.objects.create(name='соль', measurement_unit='г')
+        Ingredient.objects.create(name='соль морская', measurement_unit='г')
+        Ingredient.objects.create(name='солод', measurement_unit='г')
+        names = [item['name'] for item in ingredient_index.search('соль')]
+        self.assertEqual(names, ['соль', 'соль морская'])
+
+    @override_settings(INGREDIENT_SEARCH_LIMIT=5)
+    def test_results_are_capped(self):
+        response = self.anon_client.get('/api/ingredients/?name=инг')
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(len(ingredient_index.search('инг', limit=7)), 7)
+
+    def test_rebuilt_on_change(self):
+        self.assertEqual(ingredient_index.search('яблоко'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient = Ingredient.objects.create(
+                name='яблоко', measurement_unit='шт'
+            )
+        self.assertEqual(
+            ingredient_index.search('яблоко'),
+            [{'id': ingredient.id, 'name': 'яблоко',
+              'measurement_unit': 'шт'}]
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient.delete()
+        self.assertEqual(ingredient_index.search('яблоко'), [])
+
+    @override_settings(INGREDIENT_INDEX_CHECK_INTERVAL=0)
+    def test_version_check_sees_bulk_changes(self):
+        ingredient_index.search()
+        Ingredient.objects.bulk_create([
+            Ingredient(name='яблоко', measurement_unit='шт')
+        ])
+        self.assertEqual(len(ingredient_index.search('яблоко')), 1)
+
+    @override_settings(INGREDIENT_INDEX_CHECK_INTERVAL=0)
+    def test_version_check_sees_updates_without_signals(self):
+        ingredient = self.ingredients[0]
+        checksum = ingredient_index.checksum
+        Ingredient.objects.filter(pk=ingredient.pk).update(
+            name='яблоко', measurement_unit='шт'
+        )
+        self.assertEqual(
+            ingredient_index.search('яблоко'),
+            [{'id': ingredient.id, 'name': 'яблоко',
+              'measurement_unit': 'шт'}]
+        )
+        self.assertNotEqual(ingredient_index.checksum, checksum)
+
+
+class IngredientFuzzySearchTest(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        Ingredient.objects.bulk_create([
+            Ingredient(name=name, measurement_unit='г') for name in (
+                'сахар', 'сахарная пудра', 'коричневый сахар',
+                'тростниковыйсахар', 'сохар', 'соль',
+            )
+        ])
+        ingredient_index.invalidate()
+
+    def fuzzy(self, name, **params):
+        response = self.anon_client.get(
+            '/api/ingredients/', {'name': name, 'match': 'fuzzy', **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.data]
+
+    def test_ranking(self):
+        self.assertEqual(self.fuzzy('Сахар'), [
+            'сахар', 'сахарная пудра', 'коричневый сахар',
+            'тростниковыйсахар', 'сохар',
+        ])
+
+    def test_short_substring(self):
+        self.assertEqual(
+            self.fuzzy('ах'), [
+                'коричневый сахар', 'сахар', 'сахарная пудра',
+                'тростниковыйсахар',
+            ]
+        )
+
+    def test_typo(self):
+        self.assertIn('сахар', self.fuzzy('сахр'))
+        self.assertEqual(self.fuzzy('квас'), [])
+
+    @override_settings(INGREDIENT_SEARCH_LIMIT=2)
+    def test_results_are_capped(self):
+        self.assertEqual(self.fuzzy('сахар'), ['сахар', 'сахарная пудра'])
+        self.assertEqual(len(self.fuzzy('')), 2)
+
+    def test_prefix_mode_unchanged(self):
+        response = self.anon_client.get('/api/ingredients/?name=сахар')
+        self.assertEqual(
+            [item['name'] for item in response.data],
+            ['сахар', 'сахарная пудра']
+        )
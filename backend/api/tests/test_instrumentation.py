@@ -0,0 +1,74 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import override_settings
+
+from api.metrics import HISTOGRAMS, QUERY_BUCKETS
+from api.tests.base import FoodgramAPITestCase
+
+
+class InstrumentationTest(FoodgramAPITestCase):
+
+    def server_timing(self, response):
+        metrics = {}
+        for item in response['Server-Timing'].split(', '):
+            name, value = item.split(';')
+            metrics[name] = value.split('=')[1].strip('"')
+        return metrics
+
+    def test_server_timing_header(self):
+        response = self.auth_client.get('/api/recipes/?limit=3')
+        metrics = self.server_timing(response)
+        self.assertEqual(
+            sorted(metrics),
+            ['db', 'queries', 'render', 'serialize', 'total']
+        )
+        self.assertGreater(int(metrics['queries']), 0)
+        self.assertGreater(float(metrics['serialize']), 0)
+        self.assertGreaterEqual(
+            float(metrics['total']), float(metrics['serialize'])
+        )
+
+    def test_metrics_per_route(self):
+        self.anon_client.get(f'/api/recipes/{self.recipes[0].id}/')
+        self.anon_client.get('/api/nowhere/')
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn(
+            '# TYPE foodgram_request_duration_seconds histogram', body
+        )
+        self.assertIn(
+            'foodgram_db_queries_count{route="api/recipes/(?P<pk>[^/.]+)/$",'
+            'method="GET",status="200"}',
+            body
+        )
+        self.assertIn('route="unmatched",method="GET",status="404"', body)
+
+    def test_metrics_merge_worker_snapshots(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(METRICS_DIR=directory):
+                self.anon_client.get('/api/tags/')
+                labels, _, _, count = next(
+                    series for series in HISTOGRAMS['queries'].snapshot()
+                    if series[0][0] == 'api/tags/$'
+                )
+                other_worker = {'queries': [
+                    [labels, [1] * len(QUERY_BUCKETS), 1.0, 1]
+                ]}
+                Path(directory, '1.json').write_text(
+                    json.dumps(other_worker)
+                )
+                body = self.client.get('/metrics').content.decode()
+        self.assertIn(
+            'foodgram_db_queries_count{route="api/tags/$",method="GET",'
+            f'status="200"}} {count + 1}',
+            body
+        )
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,115 @@
+import asyncio
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import (LiveServerTestCase, SimpleTestCase,
+                         override_settings)
+
+from api.loadtest import Connection, percentile
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from tags.models import Tag
+from users.models import User
+
+
+@override_settings(METRICS_DIR='')
+class LoadTestCommandTest(LiveServerTestCase):
+
+    def setUp(self):
+        author = User.objects.create_user(
+            username='author', email='author@example.com',
+            first_name='Автор', last_name='Авторов', password='password'
+        )
+        tags = [
+            Tag.objects.create(name=f'Тег {i}', slug=f'tag{i}')
+            for i in range(3)
+        ]
+        ingredient = Ingredient.objects.create(
+            name='соль', measurement_unit='г'
+        )
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                author=author, name=f'Рецепт {i}', text='Описание',
+                cooking_time=5, image='recipes/images/test.png'
+            )
+            for i in range(8)
+        ])
+        for i, recipe in enumerate(recipes):
+            recipe.tags.set(tags[:i % 3 + 1])
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=1
+            )
+
+    def run_command(self, *args):
+        stdout = StringIO()
+        call_command(
+            'loadtest', '--base-url', self.live_server_url,
+            '--concurrency', '3', '--users', '2', '--seed', '1',
+            *args, stdout=stdout
+        )
+        return json.loads(stdout.getvalue())
+
+    def test_scenarios_report(self):
+        report = self.run_command('--requests', '60')
+        self.assertGreaterEqual(report['total']['requests'], 60)
+        self.assertEqual(report['total']['errors'], 0, report['endpoints'])
+        self.assertIn('GET /api/recipes/', report['endpoints'])
+        self.assertIn(
+            'POST /api/recipes/{id}/favorite/', report['endpoints']
+        )
+        for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms', 'error_rate'):
+            self.assertIn(key, report['total'])
+
+    def test_replay(self):
+        path = '/tmp/loadtest_replay.ndjson'
+        with open(path, 'w') as file:
+            file.write(json.dumps({'method': 'GET', 'path': '/api/tags/'}))
+            file.write('\n')
+            file.write(json.dumps({
+                'method': 'GET', 'path': '/api/recipes/999999/',
+                'expected': [404],
+            }))
+        report = self.run_command('--requests', '10', '--replay', path)
+        self.assertEqual(
+            sorted(report['endpoints']),
+            ['GET /api/recipes/{id}/', 'GET /api/tags/']
+        )
+        self.assertEqual(report['total']['errors'], 0)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.95), 7)
+
+
+class ConnectionRetryTest(SimpleTestCase):
+    """Первый запрос сервер читает и закрывает соединение без ответа."""
+
+    async def send(self, method):
+        received = []
+
+        async def handle(reader, writer):
+            await reader.readuntil(b'\r\n\r\n')
+            received.append(method)
+            if len(received) > 1:
+                writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n')
+                await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        connection = Connection('127.0.0.1', port)
+        try:
+            status = (await connection.request(method, '/', {}))[0]
+        except ConnectionError:
+            status = None
+        finally:
+            await connection.close()
+            server.close()
+            await server.wait_closed()
+        return status, len(received)
+
+    def test_only_idempotent_requests_are_retried(self):
+        self.assertEqual(asyncio.run(self.send('GET')), (200, 2))
+        self.assertEqual(asyncio.run(self.send('POST')), (None, 1))
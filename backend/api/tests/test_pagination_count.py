@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.tests.base import FoodgramAPITestCase
+from recipes.models import Favorite, Recipe
+
+URL = '/api/recipes/?tags=tag0&tags=tag1&limit=2'
+
+
+class PaginationCountModeTest(FoodgramAPITestCase):
+
+    def get(self, client=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = (client or self.auth_client).get(URL)
+        self.assertEqual(response.status_code, 200)
+        counted = any(
+            'COUNT(' in query['sql'].upper() for query in queries
+        )
+        return response, counted
+
+    def expected_count(self):
+        return Recipe.objects.filter(
+            tags__slug__in=['tag0', 'tag1']
+        ).distinct().count()
+
+    def test_exact(self):
+        response, counted = self.get()
+        self.assertTrue(counted)
+        self.assertEqual(response['X-Count-Mode'], 'exact')
+        self.assertEqual(response.data['count'], self.expected_count())
+
+    @override_settings(PAGINATION_COUNT_MODE='cached')
+    def test_cached(self):
+        response, counted = self.get()
+        self.assertTrue(counted)
+        self.assertEqual(response['X-Count-Mode'], 'cached')
+        response, counted = self.get()
+        self.assertFalse(counted)
+        self.assertEqual(response.data['count'], self.expected_count())
+
+    @override_settings(PAGINATION_COUNT_MODE='cached')
+    def test_mode_header_on_response_cache_hit(self):
+        for _ in range(2):
+            response, _ = self.get(self.anon_client)
+            self.assertEqual(response['X-Count-Mode'], 'cached')
+
+    @override_settings(PAGINATION_COUNT_MODE='cached')
+    def test_cached_invalidated_by_recipe_write(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipes[0].delete()
+        response, counted = self.get()
+        self.assertTrue(counted)
+        self.assertEqual(response.data['count'], self.expected_count())
+
+    @override_settings(PAGINATION_COUNT_MODE='cached')
+    def test_favorites_are_counted_exactly(self):
+        url = '/api/recipes/?is_favorited=1&limit=100'
+        before = self.auth_client.get(url)
+        self.assertEqual(before['X-Count-Mode'], 'exact')
+        recipe = Recipe.objects.exclude(favorites__user=self.user).first()
+        self.auth_client.post(f'/api/recipes/{recipe.id}/favorite/')
+        response = self.auth_client.get(url)
+        self.assertEqual(response.data['count'], before.data['count'] + 1)
+        self.assertEqual(
+            len(response.data['results']), response.data['count']
+        )
+        self.assertEqual(
+            response.data['count'],
+            Favorite.objects.filter(user=self.user).count()
+        )
+
+    @override_settings(PAGINATION_COUNT_MODE='estimate')
+    def test_estimate_falls_back_to_exact(self):
+        response, counted = self.get()
+        self.assertTrue(counted)
+        self.assertEqual(response['X-Count-Mode'], 'exact')
+        self.assertEqual(response.data['count'], self.expected_count())
+
+    @override_settings(
+        PAGINATION_COUNT_MODE='estimate',
+        PAGINATION_COUNT_ESTIMATE_THRESHOLD=10
+    )
+    def test_estimate_above_threshold(self):
+        with mock.patch(
+            'api.paginations.EstimatedCountPaginator._estimate',
+            return_value=12345
+        ):
+            response, counted = self.get()
+        self.assertFalse(counted)
+        self.assertEqual(response['X-Count-Mode'], 'estimate')
+        self.assertEqual(response.data['count'], 12345)
@@ -0,0 +1,245 @@
+from rest_framework.authtoken.models import Token
+
+from api.tests.base import IMAGE_BASE64, FoodgramAPITestCase
+
+PAGE_SIZES = (1, 6, 24)
+MAX_SECONDS = 1.0
+
+
+class ReadEndpointsBudgetTest(FoodgramAPITestCase):
+
+    def test_tags(self):
+        for client in (self.anon_client, self.auth_client):
+            self.assertBudget(client, 'get', '/api/tags/', 2, MAX_SECONDS)
+            self.assertBudget(
+                client, 'get', f'/api/tags/{self.tags[0].id}/',
+                2, MAX_SECONDS
+            )
+
+    def test_ingredients(self):
+        self.assertBudget(
+            self.anon_client, 'get', '/api/ingredients/', 2, MAX_SECONDS
+        )
+        for client in (self.anon_client, self.auth_client):
+            self.assertBudget(
+                client, 'get', '/api/ingredients/', 0, MAX_SECONDS
+            )
+            self.assertBudget(
+                client, 'get', '/api/ingredients/?name=ингредиент 01',
+                0, MAX_SECONDS
+            )
+            self.assertBudget(
+                client, 'get', f'/api/ingredients/{self.ingredients[0].id}/',
+                1, MAX_SECONDS
+            )
+
+    def test_recipe_list_anonymous(self):
+        for url in (
+            '/api/recipes/',
+            '/api/recipes/?tags=tag0&tags=tag2',
+            f'/api/recipes/?author={self.users[1].id}',
+        ):
+            self.assertFlatQueries(
+                self.anon_client, url, PAGE_SIZES, 5, MAX_SECONDS
+            )
+
+    def test_recipe_list_authenticated(self):
+        for url in (
+            '/api/recipes/',
+            '/api/recipes/?tags=tag0&tags=tag2',
+            f'/api/recipes/?author={self.users[1].id}',
+            '/api/recipes/?is_favorited=1',
+            '/api/recipes/?is_in_shopping_cart=1',
+        ):
+            self.assertFlatQueries(
+                self.auth_client, url, PAGE_SIZES, 6, MAX_SECONDS
+            )
+
+    def test_recipe_detail(self):
+        url = f'/api/recipes/{self.recipes[0].id}/'
+        self.assertBudget(self.anon_client, 'get', url, 3, MAX_SECONDS)
+        self.assertBudget(self.auth_client, 'get', url, 4, MAX_SECONDS)
+
+    def test_recipe_get_link(self):
+        url = f'/api/recipes/{self.recipes[0].id}/get-link/'
+        self.assertBudget(self.anon_client, 'get', url, 0, MAX_SECONDS)
+
+    def test_download_shopping_cart(self):
+        self.assertBudget(
+            self.auth_client, 'get', '/api/recipes/download_shopping_cart/',
+            1, MAX_SECONDS
+        )
+        self.assertBudget(
+            self.anon_client, 'get', '/api/recipes/download_shopping_cart/',
+            0, MAX_SECONDS, status_code=401
+        )
+
+    def test_user_list(self):
+        for client in (self.anon_client, self.auth_client):
+            self.assertFlatQueries(
+                client, '/api/users/', PAGE_SIZES, 3, MAX_SECONDS
+            )
+
+    def test_user_list_staff(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.assertFlatQueries(
+            self.auth_client, '/api/users/', PAGE_SIZES, 3, MAX_SECONDS
+        )
+
+    def test_user_detail(self):
+        url = f'/api/users/{self.users[1].id}/'
+        self.assertBudget(self.anon_client, 'get', url, 1, MAX_SECONDS)
+        self.assertBudget(self.auth_client, 'get', url, 1, MAX_SECONDS)
+
+    def test_user_me(self):
+        self.assertBudget(
+            self.auth_client, 'get', '/api/users/me/', 1, MAX_SECONDS
+        )
+        self.assertBudget(
+            self.anon_client, 'get', '/api/users/me/',
+            0, MAX_SECONDS, status_code=401
+        )
+
+    def test_subscriptions(self):
+        for url in (
+            '/api/users/subscriptions/',
+            '/api/users/subscriptions/?recipes_limit=2',
+        ):
+            self.assertFlatQueries(
+                self.auth_client, url, PAGE_SIZES, 3, MAX_SECONDS
+            )
+
+
+class WriteEndpointsBudgetTest(FoodgramAPITestCase):
+
+    def recipe_payload(self, ingredients_count=5):
+        return {
+            'name': 'Новый рецепт',
+            'text': 'Описание',
+            'cooking_time': 15,
+            'image': IMAGE_BASE64,
+            'tags': [tag.id for tag in self.tags],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': 10}
+                for ingredient in self.ingredients[:ingredients_count]
+            ],
+        }
+
+    def test_recipe_create_update_delete(self):
+        response, _ = self.assertBudget(
+            self.auth_client, 'post', '/api/recipes/', 15, MAX_SECONDS,
+            data=self.recipe_payload(), status_code=201
+        )
+        url = f'/api/recipes/{response.data["id"]}/'
+        self.assertBudget(
+            self.auth_client, 'patch', url, 14, MAX_SECONDS,
+            data=self.recipe_payload(), status_code=200
+        )
+        self.assertBudget(
+            self.auth_client, 'delete', url, 14, MAX_SECONDS,
+            status_code=204
+        )
+
+    def test_recipe_write_does_not_depend_on_ingredients_count(self):
+        counts = {}
+        for ingredients_count in (1, 30):
+            response, counts[ingredients_count] = self.assertBudget(
+                self.auth_client, 'post', '/api/recipes/', 15, MAX_SECONDS,
+                data=self.recipe_payload(ingredients_count), status_code=201
+            )
+            _, counts[-ingredients_count] = self.assertBudget(
+                self.auth_client, 'patch',
+                f'/api/recipes/{response.data["id"]}/', 14, MAX_SECONDS,
+                data=self.recipe_payload(ingredients_count)
+            )
+        self.assertEqual(counts[1], counts[30])
+        self.assertEqual(counts[-1], counts[-30])
+
+    def test_recipe_create_anonymous(self):
+        self.assertBudget(
+            self.anon_client, 'post', '/api/recipes/', 0, MAX_SECONDS,
+            data=self.recipe_payload(), status_code=401
+        )
+
+    def test_favorite_and_shopping_cart(self):
+        recipe = self.recipes[1]
+        for action, add_budget, delete_budget in (
+            ('favorite', 3, 3),
+            ('shopping_cart', 8, 8),
+        ):
+            url = f'/api/recipes/{recipe.id}/{action}/'
+            self.assertBudget(
+                self.auth_client, 'post', url, add_budget, MAX_SECONDS,
+                status_code=201
+            )
+            self.assertBudget(
+                self.auth_client, 'post', url, 2, MAX_SECONDS,
+                status_code=400
+            )
+            self.assertBudget(
+                self.auth_client, 'delete', url, delete_budget, MAX_SECONDS,
+                status_code=204
+            )
+            self.assertBudget(
+                self.anon_client, 'post', url, 0, MAX_SECONDS,
+                status_code=401
+            )
+
+    def test_subscribe(self):
+        author = self.users[1]
+        url = f'/api/users/{author.id}/subscribe/'
+        self.assertBudget(
+            self.auth_client, 'delete', url, 3, MAX_SECONDS,
+            status_code=204
+        )
+        self.assertBudget(
+            self.auth_client, 'post', url, 5, MAX_SECONDS,
+            status_code=201
+        )
+
+    def test_avatar(self):
+        url = '/api/users/me/avatar/'
+        self.assertBudget(
+            self.auth_client, 'put', url, 1, MAX_SECONDS,
+            data={'avatar': IMAGE_BASE64}
+        )
+        self.assertBudget(
+            self.auth_client, 'delete', url, 1, MAX_SECONDS,
+            status_code=204
+        )
+
+    def test_user_create_and_set_password(self):
+        self.assertBudget(
+            self.anon_client, 'post', '/api/users/', 5, MAX_SECONDS,
+            data={
+                'email': 'new@foodgram.ru',
+                'username': 'new_user',
+                'first_name': 'Имя',
+                'last_name': 'Фамилия',
+                'password': 'Pa55w0rd!new',
+            },
+            status_code=201
+        )
+        self.assertBudget(
+            self.auth_client, 'post', '/api/users/set_password/',
+            1, MAX_SECONDS,
+            data={
+                'current_password': 'Pa55w0rd!',
+                'new_password': 'Pa55w0rd!new',
+            },
+            status_code=204
+        )
+
+    def test_token_login_logout(self):
+        self.assertBudget(
+            self.anon_client, 'post', '/api/auth/token/login/',
+            6, MAX_SECONDS,
+            data={'email': self.user.email, 'password': 'Pa55w0rd!'}
+        )
+        token = Token.objects.get(user=self.user)
+        self.anon_client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+        self.assertBudget(
+            self.anon_client, 'post', '/api/auth/token/logout/',
+            3, MAX_SECONDS, status_code=204
+        )
@@ -0,0 +1,134 @@
+import json
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.parsers import NDJSONParser
+from api.tests.base import IMAGE_BASE64, FoodgramAPITestCase
+from recipes.models import Recipe, get_tags_mask
+
+
+class RecipeImportTest(FoodgramAPITestCase):
+
+    def row(self, number, **changes):
+        return {
+            'name': f'Импорт {number}',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': IMAGE_BASE64,
+            'tags': [self.tags[number % len(self.tags)].id],
+            'ingredients': [
+                {'id': self.ingredients[number % 50].id, 'amount': 2},
+                {'id': self.ingredients[number % 50 + 1].id, 'amount': 3},
+            ],
+            **changes,
+        }
+
+    def post(self, data, content_type='application/json', user=None):
+        return self.client_for(user or self.user).post(
+            '/api/recipes/import/', data, content_type=content_type
+        )
+
+    @override_settings(RECIPE_IMPORT_BATCH_SIZE=40)
+    def test_queries_per_batch(self):
+        rows = [self.row(number) for number in range(120)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(json.dumps(rows))
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(len(response.data['created']), 120)
+        self.assertEqual(response.data['errors'], [])
+        self.assertLess(len(queries), 30)
+        recipe = Recipe.objects.prefetch_related(
+            'tags', 'recipeingredient_set'
+        ).get(pk=response.data['created'][5])
+        self.assertEqual(recipe.author, self.user)
+        self.assertEqual(
+            recipe.tags_mask,
+            get_tags_mask(tag.id for tag in recipe.tags.all())
+        )
+        self.assertEqual(
+            [item.amount for item in recipe.recipeingredient_set.all()],
+            [2, 3]
+        )
+        self.assertTrue(recipe.image.name.startswith('recipes/images/'))
+
+    def test_ndjson_with_row_errors(self):
+        lines = [
+            json.dumps(self.row(0)),
+            '{не json',
+            json.dumps(self.row(2, tags=[999])),
+            json.dumps(self.row(3, cooking_time=0, image='data:image/png')),
+            '',
+            json.dumps(self.row(4)),
+        ]
+        response = self.post(
+            '\n'.join(lines), content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['created']), 2)
+        errors = {error['row']: error['errors'] for error in response.data[
+            'errors'
+        ]}
+        self.assertEqual(sorted(errors), [1, 2, 3])
+        self.assertEqual(errors[2], {'tags': ['Несуществующие теги: 999']})
+        self.assertEqual(sorted(errors[3]), ['cooking_time', 'image'])
+
+    def test_string_ids_are_accepted(self):
+        row = self.row(0)
+        row['tags'] = [str(tag) for tag in row['tags']]
+        row['ingredients'] = [
+            {**item, 'id': str(item['id'])} for item in row['ingredients']
+        ]
+        response = self.post(json.dumps([row]))
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['errors'], [])
+
+    def test_duplicate_and_missing_ids(self):
+        ingredient = self.row(0)['ingredients'][0]
+        response = self.post(json.dumps([
+            self.row(0, ingredients=[ingredient, ingredient]),
+            self.row(1, tags=[998, 999]),
+        ]))
+        errors = [error['errors'] for error in response.data['errors']]
+        self.assertEqual(errors, [
+            {'non_field_errors': ['Повторяющиеся ингридиенты']},
+            {'tags': ['Несуществующие теги: 998, 999']},
+        ])
+
+    @override_settings(RECIPE_IMPORT_BATCH_SIZE=2, RECIPE_IMPORT_MAX_ROWS=3)
+    def test_ndjson_rows_over_limit_are_not_read(self):
+        response = self.post(
+            '\n'.join(json.dumps(self.row(number)) for number in range(5)),
+            content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['created']), 3)
+        self.assertEqual(
+            [error['row'] for error in response.data['errors']], [3]
+        )
+
+    def test_ndjson_is_parsed_lazily(self):
+        read = []
+
+        def stream():
+            for number in range(3):
+                read.append(number)
+                yield json.dumps({'number': number}).encode()
+
+        rows = NDJSONParser().parse(stream())
+        self.assertEqual(next(rows), {'number': 0})
+        self.assertEqual(read, [0])
+
+    @override_settings(RECIPE_IMPORT_JSON_MAX_SIZE=100)
+    def test_large_json_array_is_rejected(self):
+        response = self.post(json.dumps([self.row(0)]))
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Recipe.objects.filter(name='Импорт 0').exists())
+
+    def test_rejects_non_list_and_anonymous(self):
+        self.assertEqual(self.post(json.dumps(self.row(0))).status_code, 400)
+        response = self.anon_client.post(
+            '/api/recipes/import/', [self.row(0)], format='json'
+        )
+        self.assertEqual(response.status_code, 401)
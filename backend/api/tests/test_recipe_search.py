@@ -0,0 +1,59 @@
+from api.tests.base import FoodgramAPITestCase
+from recipes.models import Recipe
+
+
+class RecipeSearchTest(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.borscht, self.soup, self.salad = self.recipes[:13:6]
+        Recipe.objects.filter(pk=self.borscht.pk).update(
+            name='Борщ украинский', text='Свекла, капуста и томаты'
+        )
+        Recipe.objects.filter(pk=self.soup.pk).update(
+            name='Суп с фрикадельками', text='Подавать как борщ, со сметаной'
+        )
+        Recipe.objects.filter(pk=self.salad.pk).update(
+            name='Салат из свеклы', text='Свекла и чеснок'
+        )
+
+    def search(self, query, client=None, **params):
+        response = (client or self.anon_client).get(
+            '/api/recipes/', {'search': query, 'limit': 100, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return [recipe['id'] for recipe in response.data['results']]
+
+    def test_name_ranks_above_text(self):
+        self.assertEqual(
+            self.search('борщ'), [self.borscht.id, self.soup.id]
+        )
+
+    def test_prefix_and_all_words(self):
+        self.assertEqual(
+            self.search('свекл'), [self.salad.id, self.borscht.id]
+        )
+        self.assertEqual(self.search('свекла капуста'), [self.borscht.id])
+        self.assertEqual(self.search('"ананас'), [])
+
+    def test_combines_with_filters(self):
+        self.assertEqual(
+            self.search('борщ', author=self.borscht.author_id),
+            [self.borscht.id]
+        )
+        client = self.client_for(self.users[-1])
+        client.post(
+            f'/api/recipes/{self.soup.id}/favorite/'
+        )
+        self.assertEqual(
+            self.search('борщ', client, is_favorited=1), [self.soup.id]
+        )
+
+    def test_index_follows_updates(self):
+        self.borscht.refresh_from_db()
+        self.borscht.name = 'Щи'
+        self.borscht.save()
+        self.assertEqual(self.search('щи'), [self.borscht.id])
+        self.assertEqual(self.search('украинский'), [])
+        self.soup.delete()
+        self.assertEqual(self.search('фрикадельками'), [])
@@ -0,0 +1,127 @@
+import base64
+from pathlib import Path
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.tests.base import (IMAGE_BASE64, MEDIA_ROOT, SMALL_GIF,
+                            FoodgramAPITestCase)
+from recipes.models import RecipeIngredient
+
+
+class RecipeUpdateTest(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.recipes[0]
+        self.client = self.client_for(self.recipe.author)
+        path = Path(MEDIA_ROOT) / self.recipe.image.name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(SMALL_GIF)
+        self.payload = {
+            'name': self.recipe.name,
+            'text': self.recipe.text,
+            'cooking_time': self.recipe.cooking_time,
+            'image': IMAGE_BASE64,
+            'tags': list(self.recipe.tags.values_list('id', flat=True)),
+            'ingredients': [
+                {'id': item.ingredient_id, 'amount': item.amount}
+                for item in self.recipe.recipeingredient_set.all()
+            ],
+        }
+
+    def patch(self, **changes):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                f'/api/recipes/{self.recipe.id}/',
+                {**self.payload, **changes}, format='json'
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        return [
+            query['sql'].split()[0] + ' ' + query['sql'].split('"')[1]
+            for query in queries.captured_queries
+            if not query['sql'].startswith(
+                ('SELECT', 'SAVEPOINT', 'RELEASE')
+            )
+        ]
+
+    def test_scalar_fields_are_saved(self):
+        self.patch(name='Новое имя', text='Новый текст', cooking_time=99)
+        self.recipe.refresh_from_db()
+        self.assertEqual(
+            (self.recipe.name, self.recipe.text, self.recipe.cooking_time),
+            ('Новое имя', 'Новый текст', 99)
+        )
+
+    def test_only_changed_rows_are_written(self):
+        ingredients = self.payload['ingredients']
+        ingredients[0] = {
+            **ingredients[0], 'amount': ingredients[0]['amount'] + 1
+        }
+        writes = self.patch(ingredients=ingredients)
+        self.assertEqual(
+            [write for write in writes if 'shoppingcart' not in write],
+            ['UPDATE recipes_recipeingredient']
+        )
+
+    def test_image_saved_only_when_content_changes(self):
+        for _ in range(2):
+            self.assertEqual(self.patch(), [])
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image.name, 'recipes/images/test.gif')
+        other_image = SMALL_GIF[:-1] + b'\x00\x3b'
+        writes = self.patch(
+            image='data:image/gif;base64,'
+            + base64.b64encode(other_image).decode()
+        )
+        self.assertEqual(writes, ['UPDATE recipes_recipe'])
+        self.recipe.refresh_from_db()
+        self.assertNotEqual(
+            self.recipe.image.name, 'recipes/images/test.gif'
+        )
+
+    def test_ingredient_and_tag_diff(self):
+        kept, removed = self.payload['ingredients'][:2]
+        added = self.ingredients[-1]
+        tags = [self.tags[-1].id]
+        writes = self.patch(
+            ingredients=[kept, {'id': added.id, 'amount': 7}], tags=tags
+        )
+        self.assertNotIn('UPDATE recipes_recipeingredient', writes)
+        self.assertEqual(
+            dict(self.recipe.recipeingredient_set.values_list(
+                'ingredient_id', 'amount'
+            )),
+            {kept['id']: kept['amount'], added.id: 7}
+        )
+        self.assertEqual(
+            list(self.recipe.tags.values_list('id', flat=True)), tags
+        )
+        self.assertFalse(RecipeIngredient.objects.filter(
+            recipe=self.recipe, ingredient_id=removed['id']
+        ).exists())
+
+    def test_missing_ids_reported_at_once(self):
+        response = self.client.patch(
+            f'/api/recipes/{self.recipe.id}/', {
+                **self.payload,
+                'tags': [self.tags[0].id, 998, 999],
+                'ingredients': [
+                    {'id': self.ingredients[0].id, 'amount': 1},
+                    {'id': 9998, 'amount': 1},
+                    {'id': 9999, 'amount': 1},
+                ],
+            }, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {
+            'tags': ['Несуществующие теги: 998, 999'],
+            'ingredients': ['Несуществующие ингредиенты: 9998, 9999'],
+        })
+
+    def test_response_contains_ingredient_ids(self):
+        response = self.client.get(f'/api/recipes/{self.recipe.id}/')
+        self.assertEqual(
+            [item['id'] for item in response.data['ingredients']],
+            [item['id'] for item in self.payload['ingredients']]
+        )
@@ -0,0 +1,101 @@
+import base64
+from io import BytesIO, StringIO
+
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from api.renditions import update_renditions
+from api.tests.base import FoodgramAPITestCase
+from recipes.models import Recipe
+
+
+def make_image_base64(width=1200, height=900):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (200, 120, 40)).save(buffer, 'PNG')
+    return (
+        'data:image/png;base64,'
+        + base64.b64encode(buffer.getvalue()).decode()
+    )
+
+
+class ImageRenditionsTest(FoodgramAPITestCase):
+
+    def create_recipe(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.auth_client.post('/api/recipes/', {
+                'name': 'С картинкой',
+                'text': 'Описание',
+                'cooking_time': 5,
+                'image': make_image_base64(),
+                'tags': [self.tags[0].id],
+                'ingredients': [{'id': self.ingredients[0].id, 'amount': 1}],
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return Recipe.objects.get(id=response.data['id'])
+
+    def test_recipe_renditions_created(self):
+        recipe = self.create_recipe()
+        self.assertEqual(recipe.image_renditions['source'], recipe.image.name)
+        for key, width in (('small.jpeg', 320), ('medium.webp', 640)):
+            with default_storage.open(recipe.image_renditions[key]) as file:
+                with Image.open(file) as image:
+                    self.assertEqual(image.size, (width, width * 3 // 4))
+
+        data = self.anon_client.get(
+            f'/api/recipes/{recipe.id}/?renditions=1'
+        ).data
+        self.assertTrue(
+            data['image_renditions']['small']['webp'].endswith(
+                recipe.image_renditions['small.webp']
+            )
+        )
+
+    def test_renditions_invalidate_response_cache(self):
+        recipe = self.create_recipe()
+        Recipe.objects.filter(pk=recipe.pk).update(image_renditions={})
+        url = f'/api/recipes/{recipe.id}/?renditions=1'
+        fallback = self.anon_client.get(url).data['image_renditions']
+        with self.captureOnCommitCallbacks(execute=True):
+            update_renditions(Recipe, recipe.pk, 'image')
+        self.assertNotEqual(
+            self.anon_client.get(url).data['image_renditions'], fallback
+        )
+
+    def test_renditions_hidden_by_default(self):
+        data = self.anon_client.get(f'/api/recipes/{self.recipes[0].id}/').data
+        self.assertNotIn('image_renditions', data)
+        self.assertNotIn('avatar_renditions', data['author'])
+
+    def test_fallback_to_original(self):
+        recipe = self.recipes[0]
+        data = self.anon_client.get(
+            f'/api/recipes/{recipe.id}/?renditions=1'
+        ).data
+        self.assertEqual(
+            data['image_renditions']['medium']['jpeg'], data['image']
+        )
+        self.assertIsNone(data['author']['avatar_renditions'])
+
+    def test_avatar_renditions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.auth_client.put(
+                '/api/users/me/avatar/', {'avatar': make_image_base64()},
+                format='json'
+            )
+        self.user.refresh_from_db()
+        data = self.auth_client.get('/api/users/me/?renditions=1').data
+        self.assertTrue(
+            data['avatar_renditions']['small']['jpeg'].endswith(
+                self.user.avatar_renditions['small.jpeg']
+            )
+        )
+
+    def test_generate_command(self):
+        recipe = self.create_recipe()
+        Recipe.objects.filter(id=recipe.id).update(image_renditions={})
+        call_command(
+            'generate_renditions', stdout=StringIO(), stderr=StringIO()
+        )
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.image_renditions['source'], recipe.image.name)
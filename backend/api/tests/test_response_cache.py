@@ -0,0 +1,102 @@
+from api.tests.base import IMAGE_BASE64, FoodgramAPITestCase
+
+
+class AnonymousResponseCacheTest(FoodgramAPITestCase):
+
+    def get(self, client, url, queries=None):
+        if queries is None:
+            response = client.get(url)
+        else:
+            with self.assertNumQueries(queries):
+                response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_anonymous_pages_are_cached(self):
+        recipe = self.recipes[0]
+        for url in (
+            '/api/recipes/?tags=tag0&tags=tag1&page=2',
+            f'/api/recipes/{recipe.id}/',
+        ):
+            data = self.get(self.anon_client, url)
+            self.assertEqual(self.get(self.anon_client, url, 0), data)
+
+    def test_headers_are_cached_with_data(self):
+        expected = self.anon_client.get('/api/recipes/')
+        with self.assertNumQueries(0):
+            response = self.anon_client.get('/api/recipes/')
+        self.assertEqual(response['X-Count-Mode'], expected['X-Count-Mode'])
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_query_params_are_normalized(self):
+        data = self.get(self.anon_client, '/api/recipes/?tags=tag1&tags=tag0')
+        self.assertEqual(
+            self.get(self.anon_client, '/api/recipes/?tags=tag0&tags=tag1', 0),
+            data
+        )
+
+    def test_authenticated_requests_are_not_cached(self):
+        self.get(self.auth_client, '/api/recipes/')
+        with self.assertNumQueries(5):
+            self.auth_client.get('/api/recipes/')
+
+    def test_recipe_update_invalidates(self):
+        recipe = self.recipes[-1]
+        url = f'/api/recipes/{recipe.id}/'
+        self.get(self.anon_client, '/api/recipes/')
+        self.get(self.anon_client, url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client_for(recipe.author).patch(url, {
+                'name': recipe.name,
+                'text': recipe.text,
+                'cooking_time': recipe.cooking_time,
+                'image': IMAGE_BASE64,
+                'tags': [self.tags[2].id],
+                'ingredients': [{'id': self.ingredients[0].id, 'amount': 1}],
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        for data in (
+            self.get(self.anon_client, url),
+            self.get(self.anon_client, '/api/recipes/')['results'][0],
+        ):
+            self.assertEqual(
+                [tag['id'] for tag in data['tags']], [self.tags[2].id]
+            )
+            self.assertEqual(len(data['ingredients']), 1)
+
+    def test_author_change_invalidates(self):
+        url = f'/api/recipes/{self.recipes[0].id}/'
+        self.get(self.anon_client, url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Другое'
+            self.user.save()
+        self.assertEqual(
+            self.get(self.anon_client, url)['author']['first_name'],
+            'Другое'
+        )
+
+    def test_ingredient_change_invalidates(self):
+        recipe = self.recipes[0]
+        url = f'/api/recipes/{recipe.id}/'
+        ingredient = recipe.ingredients.first()
+        self.get(self.anon_client, url)
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient.name = 'Переименован'
+            ingredient.measurement_unit = 'кг'
+            ingredient.save()
+        self.assertIn(
+            {'name': 'Переименован', 'measurement_unit': 'кг'},
+            [
+                {key: item[key] for key in ('name', 'measurement_unit')}
+                for item in self.get(self.anon_client, url)['ingredients']
+            ]
+        )
+
+    def test_tag_change_invalidates(self):
+        url = '/api/recipes/?tags=tag0'
+        self.get(self.anon_client, url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tags[0].name = 'Переименован'
+            self.tags[0].save()
+        tags = self.get(self.anon_client, url)['results'][0]['tags']
+        self.assertIn('Переименован', [tag['name'] for tag in tags])
@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+
+from api.tests.base import FoodgramAPITestCase
+from recipes.models import RecipeIngredient
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+class ShoppingCartExportTest(FoodgramAPITestCase):
+
+    def expected_totals(self):
+        totals = {}
+        for item in RecipeIngredient.objects.filter(
+            recipe__shopping_cart__user=self.user
+        ).select_related('ingredient'):
+            key = (item.ingredient.name, item.ingredient.measurement_unit)
+            totals[key] = totals.get(key, 0) + item.amount
+        return totals
+
+    def download(self, export_format, client=None):
+        client = client or self.auth_client
+        response = client.get(URL, {'format': export_format})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn(
+            f'filename=shop_list.{export_format}',
+            response['Content-Disposition']
+        )
+        return b''.join(response.streaming_content).decode()
+
+    def test_txt(self):
+        lines = self.download('txt').splitlines()
+        self.assertEqual(lines[0], 'Список покупок:')
+        self.assertEqual(
+            lines[2:],
+            [
+                f'{name} ({unit}) - {amount}'
+                for (name, unit), amount in sorted(
+                    self.expected_totals().items()
+                )
+            ]
+        )
+
+    def test_csv(self):
+        rows = list(csv.reader(io.StringIO(self.download('csv'))))
+        self.assertEqual(rows[0], ['name', 'measurement_unit', 'amount'])
+        self.assertEqual(
+            {(name, unit): int(amount) for name, unit, amount in rows[1:]},
+            self.expected_totals()
+        )
+
+    def test_json(self):
+        data = json.loads(self.download('json'))
+        self.assertEqual(
+            {
+                (item['name'], item['measurement_unit']): item['amount']
+                for item in data
+            },
+            self.expected_totals()
+        )
+
+    def test_empty_cart_json(self):
+        client = self.client_for(self.users[1])
+        self.assertEqual(json.loads(self.download('json', client)), [])
+
+    def test_unknown_format(self):
+        response = self.auth_client.get(URL, {'format': 'pdf'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,121 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from api.tests.base import IMAGE_BASE64, FoodgramAPITestCase
+from recipes.models import (Recipe, RecipeIngredient, ShoppingCart,
+                            ShoppingCartIngredient)
+
+
+class ShoppingCartTotalsTest(FoodgramAPITestCase):
+
+    def assertTotalsConsistent(self):
+        expected = {}
+        for item in RecipeIngredient.objects.filter(
+            recipe__shopping_cart__isnull=False
+        ).values_list(
+            'recipe__shopping_cart__user', 'ingredient', 'amount'
+        ):
+            key = item[:2]
+            expected[key] = expected.get(key, 0) + item[2]
+        self.assertEqual(
+            {
+                (item.user_id, item.ingredient_id): item.amount
+                for item in ShoppingCartIngredient.objects.all()
+            },
+            expected
+        )
+
+    def test_seeded_totals(self):
+        self.assertTotalsConsistent()
+
+    def test_add_and_remove(self):
+        for user, client in (
+            (self.users[1], self.client_for(self.users[1])),
+            (self.user, self.auth_client),
+        ):
+            url = f'/api/recipes/{self.recipes[1].id}/shopping_cart/'
+            client.post(url)
+            self.assertTotalsConsistent()
+            client.delete(url)
+            self.assertTotalsConsistent()
+
+    def test_recipe_edit_and_delete(self):
+        recipe = self.recipes[0]
+        self.assertTrue(recipe.shopping_cart.filter(user=self.user).exists())
+        client = self.client_for(recipe.author)
+        client.patch(f'/api/recipes/{recipe.id}/', {
+            'name': recipe.name,
+            'text': recipe.text,
+            'cooking_time': recipe.cooking_time,
+            'image': IMAGE_BASE64,
+            'tags': [self.tags[0].id],
+            'ingredients': [
+                {'id': self.ingredients[0].id, 'amount': 7},
+                {'id': self.ingredients[40].id, 'amount': 3},
+            ],
+        }, format='json')
+        self.assertTotalsConsistent()
+        client.delete(f'/api/recipes/{recipe.id}/')
+        self.assertTotalsConsistent()
+
+    def test_repeated_remove_subtracts_once(self):
+        recipe = self.recipes[1]
+        ShoppingCart.add(self.user, recipe)
+        self.assertTrue(ShoppingCart.remove(self.user, recipe))
+        self.assertFalse(ShoppingCart.remove(self.user, recipe))
+        self.assertTotalsConsistent()
+
+    def test_orm_and_admin_paths(self):
+        recipe = self.recipes[0]
+        item = recipe.recipeingredient_set.first()
+        item.amount += 5
+        item.save()
+        self.assertTotalsConsistent()
+        item.ingredient = self.ingredients[-1]
+        item.save()
+        self.assertTotalsConsistent()
+        item.delete()
+        self.assertTotalsConsistent()
+        RecipeIngredient.objects.create(
+            recipe=recipe, ingredient=self.ingredients[-2], amount=4
+        )
+        self.assertTotalsConsistent()
+        Recipe.objects.get(pk=recipe.pk).delete()
+        self.assertTotalsConsistent()
+        ShoppingCart.objects.filter(user=self.user).first().delete()
+        self.assertTotalsConsistent()
+        self.users[1].delete()
+        self.assertTotalsConsistent()
+        self.user.delete()
+        self.assertTotalsConsistent()
+        self.ingredients[3].delete()
+        self.assertTotalsConsistent()
+
+    def test_rebuild_command(self):
+        expected = ShoppingCartIngredient.objects.count()
+        ShoppingCartIngredient.objects.all().delete()
+        stdout = StringIO()
+        call_command('rebuild_shopping_carts', batch_size=7, stdout=stdout)
+        self.assertTotalsConsistent()
+        self.assertIn(f'пересчитаны: {expected} строк', stdout.getvalue())
+
+    def test_summary_endpoint(self):
+        response = self.auth_client.get(
+            '/api/recipes/shopping_cart_summary/'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {item['id']: item['amount'] for item in response.data},
+            dict(
+                self.user.shopping_cart_ingredients.values_list(
+                    'ingredient_id', 'amount'
+                )
+            )
+        )
+        self.assertEqual(
+            self.anon_client.get(
+                '/api/recipes/shopping_cart_summary/'
+            ).status_code,
+            401
+        )
@@ -0,0 +1,85 @@
+from django.test import override_settings
+
+from api.caching import bump_generation
+from api.shortlinks import (SHORT_LINKS_GENERATION, decode, encode,
+                            hit_counter, recipe_ids)
+from api.tests.base import FoodgramAPITestCase
+from recipes.models import Recipe
+
+
+class ShortLinkTest(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        recipe_ids.clear()
+        hit_counter.flush()
+
+    def tearDown(self):
+        hit_counter.flush()
+        super().tearDown()
+
+    def test_codes_round_trip(self):
+        codes = {encode(recipe_id) for recipe_id in range(1, 1000)}
+        self.assertEqual(len(codes), 999)
+        for recipe_id in (1, 2, 999, 10 ** 9):
+            self.assertEqual(decode(encode(recipe_id)), recipe_id)
+        self.assertIsNone(decode('not-base62'))
+        self.assertIsNone(decode('z' * 20))
+
+    def test_get_link_returns_code(self):
+        recipe = self.recipes[0]
+        response = self.anon_client.get(f'/api/recipes/{recipe.id}/get-link/')
+        self.assertEqual(
+            response.data['short-link'],
+            f'http://testserver/s/{encode(recipe.id)}/'
+        )
+
+    def test_redirect_is_cached(self):
+        recipe = self.recipes[0]
+        url = f'/s/{encode(recipe.id)}/'
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertRedirects(
+            response, f'/recipes/{recipe.id}/', fetch_redirect_response=False
+        )
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_unknown_and_deleted_codes(self):
+        self.assertEqual(self.client.get('/s/-/').status_code, 404)
+        recipe = self.recipes[0]
+        url = f'/s/{encode(recipe.id)}/'
+        self.assertEqual(self.client.get(url).status_code, 302)
+        recipe.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_deleted_in_other_worker(self):
+        recipe = self.recipes[0]
+        code = encode(recipe.id)
+        url = f'/s/{code}/'
+        self.assertEqual(self.client.get(url).status_code, 302)
+        cached = recipe_ids.get(code)
+        # Другой воркер удаляет рецепт: в LRU этого процесса остаётся
+        # старая запись, меняется только поколение в общем кеше.
+        recipe.delete()
+        recipe_ids.set(code, cached)
+        bump_generation(SHORT_LINKS_GENERATION)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    @override_settings(SHORT_LINK_FLUSH_SIZE=3)
+    def test_hits_are_flushed_in_batches(self):
+        first, second = self.recipes[:2]
+        for recipe in (first, first):
+            self.client.get(f'/s/{encode(recipe.id)}/')
+        self.assertEqual(
+            Recipe.objects.get(pk=first.pk).short_link_hits, 0
+        )
+        with self.assertNumQueries(2):
+            self.client.get(f'/s/{encode(second.id)}/')
+        self.assertEqual(
+            dict(
+                Recipe.objects.filter(pk__in=(first.pk, second.pk))
+                .values_list('pk', 'short_link_hits')
+            ),
+            {first.pk: 2, second.pk: 1}
+        )
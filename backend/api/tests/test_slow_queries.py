@@ -0,0 +1,56 @@
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from api.slow_queries import recorder
+from api.tests.base import FoodgramAPITestCase
+
+
+@override_settings(SLOW_QUERY_LOG_ENABLED=True, SLOW_QUERY_THRESHOLD_MS=0)
+class SlowQueryLogTest(FoodgramAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        recorder.records.clear()
+
+    def tearDown(self):
+        recorder.records.clear()
+        super().tearDown()
+
+    def test_records_query_view_and_plan(self):
+        with self.assertLogs('api.slow_queries', 'WARNING') as logs:
+            APIClient().get(f'/api/recipes/?author={self.user.id}')
+        record = next(
+            record for record in recorder.records
+            if 'COUNT(' in record['sql']
+        )
+        self.assertEqual(
+            record['view'], 'GET api/recipes/$ (recipe-list)'
+        )
+        self.assertIn(str(self.user.id), record['params'])
+        self.assertIn('recipes_recipe', record['plan'])
+        self.assertIn('/api/', record['frame'])
+        self.assertNotIn('metrics.py', record['frame'])
+        self.assertEqual(len(logs.records), len(recorder.records))
+
+    def test_writes_are_not_explained(self):
+        with self.assertLogs('api.slow_queries', 'WARNING'):
+            self.client_for(self.user).post(
+                f'/api/recipes/{self.recipes[-1].id}/favorite/'
+            )
+        insert = next(
+            record for record in recorder.records
+            if record['sql'].startswith('INSERT')
+        )
+        self.assertIsNone(insert['plan'])
+
+    def test_admin_page_is_staff_only(self):
+        with self.assertLogs('api.slow_queries', 'WARNING'):
+            self.client.force_login(self.user)
+            APIClient().get('/api/tags/')
+            self.assertEqual(
+                self.client.get('/admin/slow-queries/').status_code, 302
+            )
+            self.user.is_staff = True
+            self.user.save(update_fields=['is_staff'])
+            response = self.client.get('/admin/slow-queries/')
+        self.assertContains(response, 'tags_tag')
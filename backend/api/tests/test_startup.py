@@ -0,0 +1,72 @@
+import runpy
+import shutil
+import tempfile
+from io import StringIO
+from types import SimpleNamespace
+
+from django.conf import settings
+
+from django.core.management import call_command
+from django.db.migrations.recorder import MigrationRecorder
+from django.test import TestCase, override_settings
+
+from api.management.commands.startup import get_pending_migrations
+
+REDIS_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/0',
+    }
+}
+
+STATIC_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(STATIC_ROOT=STATIC_ROOT)
+class StartupCommandTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def run_command(self):
+        stdout = StringIO()
+        call_command('startup', '--no-serve', stdout=stdout)
+        return stdout.getvalue()
+
+    def test_pending_migrations_take_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_pending_migrations(), [])
+        MigrationRecorder.Migration.objects.filter(
+            app='recipes', name='0012_ingredient_name_trigram_index'
+        ).delete()
+        self.assertEqual(
+            get_pending_migrations(),
+            [('recipes', '0012_ingredient_name_trigram_index')]
+        )
+
+    def test_second_start_skips_migrate_and_collectstatic(self):
+        first = self.run_command()
+        self.assertIn('статика собрана', first)
+        second = self.run_command()
+        self.assertIn('migrate пропущен', second)
+        self.assertIn('collectstatic пропущен', second)
+        self.assertIn('Подготовка заняла', second)
+
+
+@override_settings(METRICS_DIR='')
+class GunicornConfigTest(TestCase):
+
+    def start(self, workers):
+        config = runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+        config['on_starting'](
+            SimpleNamespace(cfg=SimpleNamespace(workers=workers))
+        )
+
+    def test_workers_require_shared_cache(self):
+        self.start(1)
+        with self.assertRaisesMessage(RuntimeError, 'REDIS_URL'):
+            self.start(4)
+        with override_settings(CACHES=REDIS_CACHES):
+            self.start(4)
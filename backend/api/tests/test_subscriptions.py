@@ -0,0 +1,71 @@
+from api.tests.base import RECIPES_PER_USER, FoodgramAPITestCase
+from recipes.models import Recipe
+
+URL = '/api/users/subscriptions/'
+
+
+class SubscriptionsTest(FoodgramAPITestCase):
+
+    def test_recipes_limit(self):
+        for recipes_limit in (1, 2, RECIPES_PER_USER + 1):
+            response = self.auth_client.get(
+                URL, {'recipes_limit': recipes_limit, 'limit': 100}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                len(response.data['results']), len(self.users) - 1
+            )
+            for author in response.data['results']:
+                expected = list(
+                    Recipe.objects.filter(author=author['id'])
+                    .values_list('id', flat=True)[:recipes_limit]
+                )
+                self.assertEqual(
+                    [recipe['id'] for recipe in author['recipes']], expected
+                )
+                self.assertEqual(author['recipes_count'], RECIPES_PER_USER)
+                self.assertTrue(author['is_subscribed'])
+
+    def test_invalid_recipes_limit(self):
+        for recipes_limit in ('abc', '0', '-1', '1.5'):
+            with self.subTest(recipes_limit=recipes_limit):
+                response = self.auth_client.get(
+                    URL, {'recipes_limit': recipes_limit}
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('recipes_limit', response.data)
+        author = self.users[2]
+        response = self.client_for(self.users[1]).post(
+            f'/api/users/{author.id}/subscribe/?recipes_limit=abc'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('recipes_limit', response.data)
+        self.assertFalse(
+            author.subscribers.filter(user=self.users[1]).exists()
+        )
+
+    def test_without_recipes_limit(self):
+        response = self.auth_client.get(URL)
+        for author in response.data['results']:
+            self.assertEqual(len(author['recipes']), RECIPES_PER_USER)
+
+    def test_is_subscribed_reflects_request_user(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.auth_client.get('/api/users/', {'limit': 100})
+        subscribed = {
+            user['id']: user['is_subscribed']
+            for user in response.data['results']
+        }
+        self.assertEqual(
+            subscribed,
+            {user.id: user != self.user for user in self.users}
+        )
+        author = self.users[1]
+        for client, expected in (
+            (self.auth_client, True),
+            (self.client_for(self.users[2]), False),
+            (self.anon_client, False),
+        ):
+            response = client.get(f'/api/users/{author.id}/')
+            self.assertEqual(response.data['is_subscribed'], expected)
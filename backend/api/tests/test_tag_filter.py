@@ -0,0 +1,76 @@
+from itertools import combinations
+
+from api.tests.base import IMAGE_BASE64, FoodgramAPITestCase
+from recipes.models import TAGS_MASK_BITS, Recipe, get_tags_mask
+from tags.models import Tag
+
+
+class TagMaskFilterTest(FoodgramAPITestCase):
+
+    def filtered_ids(self, slugs):
+        query = '&'.join(f'tags={slug}' for slug in slugs)
+        response = self.anon_client.get(f'/api/recipes/?{query}&limit=1000')
+        self.assertEqual(response.status_code, 200)
+        return [recipe['id'] for recipe in response.data['results']]
+
+    def expected_ids(self, slugs):
+        return list(
+            Recipe.objects.filter(tags__slug__in=slugs)
+            .distinct().values_list('id', flat=True)
+        )
+
+    def assertMasksConsistent(self):
+        for recipe in Recipe.objects.prefetch_related('tags'):
+            self.assertEqual(
+                recipe.tags_mask,
+                get_tags_mask(tag.id for tag in recipe.tags.all())
+            )
+
+    def assertMatchesJoinFilter(self):
+        slugs = list(Tag.objects.values_list('slug', flat=True)) + ['none']
+        for size in range(1, 3):
+            for combination in combinations(slugs, size):
+                self.assertEqual(
+                    self.filtered_ids(combination),
+                    self.expected_ids(combination),
+                    combination
+                )
+
+    def test_matches_join_filter(self):
+        self.assertMasksConsistent()
+        self.assertMatchesJoinFilter()
+
+    def test_mask_follows_recipe_update(self):
+        recipe = self.recipes[0]
+        response = self.client_for(recipe.author).patch(
+            f'/api/recipes/{recipe.id}/', {
+                'name': recipe.name,
+                'text': recipe.text,
+                'cooking_time': recipe.cooking_time,
+                'image': IMAGE_BASE64,
+                'tags': [self.tags[1].id, self.tags[2].id],
+                'ingredients': [{'id': self.ingredients[0].id, 'amount': 1}],
+            }, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertMasksConsistent()
+        self.assertMatchesJoinFilter()
+
+    def test_mask_follows_reverse_changes_and_deletion(self):
+        tag = self.tags[0]
+        tag.recipes.add(*self.recipes[:4])
+        tag.recipes.remove(self.recipes[5])
+        self.assertMasksConsistent()
+        tag.recipes.clear()
+        self.assertMasksConsistent()
+        self.tags[1].delete()
+        self.assertMasksConsistent()
+        self.assertMatchesJoinFilter()
+
+    def test_tags_outside_mask(self):
+        tag = Tag.objects.create(
+            id=TAGS_MASK_BITS + 10, name='Редкий', slug='rare'
+        )
+        tag.recipes.add(*self.recipes[::5])
+        self.assertMasksConsistent()
+        self.assertMatchesJoinFilter()
@@ -0,0 +1,239 @@
+"""Async-версии самых нагруженных чтений для ASGI-профиля.
+
+Анонимные GET-запросы обслуживаются через async ORM, остальные
+(с токеном, на запись, с курсором, с оценкой количества, браузерная
+версия API) передаются синхронным представлениям DRF в потоке.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Paginator
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.caching import (RECIPES_GENERATION, aget_generation,
+                         aget_model_version, get_etag,
+                         get_response_cache_key, patch_conditional_headers)
+from api.paginations import CustomPagination, get_count_cache_key
+from api.serializers.recipes import RecipeSerializer
+from api.serializers.tags import TagSerializer
+from api.shortlinks import aresolve, hit_counter
+from api.views.recipes import (IngredientViewSet, RecipeViewSet,
+                               filter_recipes, prefetch_recipe_relations)
+from api.views.shortlinks import short_link_redirect
+from api.views.tags import TagViewSet
+from recipes.models import Recipe
+from recipes.search import afuzzy_search_ingredients, ingredient_index
+from tags.models import Tag
+
+
+def with_sync_fallback(sync_view, api=True):
+    """Пускает в async-представление только анонимные GET-запросы.
+
+    Остальные запросы, а также те, для которых представление вернуло
+    None, обрабатывает sync_view. Для api=True браузерная версия API
+    и ?format= тоже остаются за DRF.
+    """
+    sync_view = sync_to_async(sync_view)
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            response = None
+            if (
+                request.method == 'GET'
+                and 'HTTP_AUTHORIZATION' not in request.META
+                and not (api and (
+                    'format' in request.GET
+                    or 'text/html' in request.headers.get('Accept', '')
+                ))
+            ):
+                response = await view(request, *args, **kwargs)
+            if response is None:
+                response = await sync_view(request, *args, **kwargs)
+            return response
+
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+def render_json(data, headers=None):
+    response = HttpResponse(
+        JSONRenderer().render(data), content_type='application/json',
+        headers=headers
+    )
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+def get_drf_request(request):
+    """Request DRF для контекста сериализаторов без аутентификации."""
+    drf_request = Request(request)
+    drf_request.user = AnonymousUser()
+    return drf_request
+
+
+async def aget_recipe_queryset(request):
+    slugs = request.GET.getlist('tags')
+    tag_ids = [
+        pk async for pk in Tag.objects.filter(
+            slug__in=slugs
+        ).values_list('id', flat=True)
+    ] if slugs else None
+    return filter_recipes(
+        prefetch_recipe_relations(Recipe.objects.all()).select_related(
+            'author'
+        ),
+        request.GET, AnonymousUser(), tag_ids
+    )
+
+
+async def acount_recipes(queryset):
+    """Количество рецептов в режиме PAGINATION_COUNT_MODE exact или cached
+    с теми же ключами кеша, что у CachedCountPaginator."""
+    if settings.PAGINATION_COUNT_MODE != 'cached':
+        return await queryset.acount()
+    key = get_count_cache_key(
+        queryset, await aget_generation(RECIPES_GENERATION)
+    )
+    count = await cache.aget(key)
+    if count is None:
+        count = await queryset.acount()
+        await cache.aset(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+async def aget_cached_data(request):
+    """Ключ и (данные, заголовки) в формате AnonymousResponseCacheMixin."""
+    key = get_response_cache_key(
+        request, RECIPES_GENERATION,
+        await aget_generation(RECIPES_GENERATION)
+    )
+    return key, await cache.aget(key, (None, {}))
+
+
+@with_sync_fallback(
+    TagViewSet.as_view({'get': 'list'}, basename='tag', detail=False)
+)
+async def tag_list(request):
+    etag = get_etag(await aget_model_version(Tag), request)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        tags = [tag async for tag in Tag.objects.all()]
+        response = render_json(TagSerializer(tags, many=True).data)
+    return patch_conditional_headers(response, etag)
+
+
+@with_sync_fallback(
+    IngredientViewSet.as_view(
+        {'get': 'list'}, basename='ingredient', detail=False
+    )
+)
+async def ingredient_list(request):
+    etag = get_etag(await ingredient_index.achecksum(), request)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        name = request.GET.get('name', '')
+        if request.GET.get('match') == 'fuzzy':
+            data = await afuzzy_search_ingredients(name)
+        else:
+            data = await ingredient_index.asearch(name)
+        response = render_json(data)
+    return patch_conditional_headers(response, etag)
+
+
+@with_sync_fallback(
+    RecipeViewSet.as_view(
+        {'get': 'list', 'post': 'create'}, basename='recipe', detail=False
+    )
+)
+async def recipe_list(request):
+    if (
+        'cursor' in request.GET
+        or settings.PAGINATION_COUNT_MODE == 'estimate'
+    ):
+        return None
+    key, (data, headers) = await aget_cached_data(request)
+    if data is not None:
+        return render_json(data, headers)
+    drf_request = get_drf_request(request)
+    queryset = await aget_recipe_queryset(request)
+    pagination = CustomPagination()
+    paginator = Paginator(queryset, pagination.get_page_size(drf_request))
+    # count у Paginator — cached_property, поэтому достаточно
+    # положить посчитанное асинхронно значение в экземпляр.
+    paginator.count = await acount_recipes(queryset)
+    number = request.GET.get(pagination.page_query_param, 1)
+    if number in pagination.last_page_strings:
+        number = paginator.num_pages
+    try:
+        page = paginator.page(number)
+    except InvalidPage:
+        return None
+    recipes = [recipe async for recipe in page.object_list]
+    url = request.build_absolute_uri()
+    previous = None
+    if page.has_previous():
+        previous = (
+            remove_query_param(url, pagination.page_query_param)
+            if page.previous_page_number() == 1
+            else replace_query_param(
+                url, pagination.page_query_param,
+                page.previous_page_number()
+            )
+        )
+    data = {
+        'count': paginator.count,
+        'next': replace_query_param(
+            url, pagination.page_query_param, page.next_page_number()
+        ) if page.has_next() else None,
+        'previous': previous,
+        'results': RecipeSerializer(
+            recipes, many=True, context={'request': drf_request}
+        ).data,
+    }
+    headers = {'X-Count-Mode': settings.PAGINATION_COUNT_MODE}
+    await cache.aset(key, (data, headers), settings.RESPONSE_CACHE_TIMEOUT)
+    return render_json(data, headers)
+
+
+@with_sync_fallback(
+    RecipeViewSet.as_view(
+        {
+            'get': 'retrieve',
+            'put': 'update',
+            'patch': 'partial_update',
+            'delete': 'destroy',
+        },
+        basename='recipe', detail=True
+    )
+)
+async def recipe_detail(request, pk):
+    key, (data, headers) = await aget_cached_data(request)
+    if data is None:
+        queryset = await aget_recipe_queryset(request)
+        try:
+            recipe = await queryset.aget(pk=pk)
+        except Recipe.DoesNotExist:
+            return None
+        data = RecipeSerializer(
+            recipe, context={'request': get_drf_request(request)}
+        ).data
+        await cache.aset(key, (data, headers), settings.RESPONSE_CACHE_TIMEOUT)
+    return render_json(data, headers)
+
+
+@with_sync_fallback(short_link_redirect, api=False)
+async def short_link(request, code):
+    recipe_id = await aresolve(code)
+    if recipe_id is None:
+        raise Http404
+    await hit_counter.ahit(recipe_id)
+    return HttpResponseRedirect(f'/recipes/{recipe_id}/')
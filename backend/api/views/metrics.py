@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from api.metrics import expose
+
+
+def metrics(request):
+    """Метрики всех воркеров (METRICS_DIR) для Prometheus.
+
+    Наружу через nginx не публикуется; если задан METRICS_TOKEN,
+    требуется заголовок Authorization: Bearer <токен>.
+    """
+    if settings.METRICS_TOKEN and not constant_time_compare(
+        request.headers.get('Authorization', ''),
+        f'Bearer {settings.METRICS_TOKEN}'
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        expose(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -1,62 +1,164 @@
-from django.db.models import Sum
-from django.http import HttpResponse
+from collections.abc import Iterator
+
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef, Prefetch, Q
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from api.filters import IngredientFilter
-from api.paginations import CustomPagination
+from api.caching import (RECIPES_GENERATION, AnonymousResponseCacheMixin,
+                         ConditionalGetMixin)
+from api.exports import SHOPPING_LIST_FORMATS
+from api.imports import import_recipes
+from api.negotiation import IgnoreClientContentNegotiation
+from api.paginations import CustomPagination, RecipeCursorPagination
+from api.parsers import NDJSONParser
 from api.permissions import IsAuthorOrReadOnly
 from api.serializers.minifield import RecipeMinifiedSerializer
-from api.serializers.recipes import IngredientSerializer, RecipeSerializer
-from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            ShoppingCart)
+from api.serializers.recipes import (IngredientSerializer, RecipeSerializer,
+                                     ShoppingCartIngredientSerializer)
+from api.shortlinks import encode
+from recipes.models import (TAGS_MASK_BITS, Favorite, Ingredient, Recipe,
+                            RecipeIngredient, ShoppingCart,
+                            ShoppingCartIngredient, get_tags_mask)
+from recipes.search import (fuzzy_search_ingredients, ingredient_index,
+                            search_recipes)
+from tags.models import Tag
+from users.models import Subscription, User
+
+
+def prefetch_recipe_relations(queryset):
+    return queryset.prefetch_related(
+        'tags',
+        Prefetch(
+            'recipeingredient_set',
+            queryset=RecipeIngredient.objects.select_related('ingredient')
+        ),
+    )
+
 
+def filter_by_tag_ids(queryset, tag_ids):
+    """Рецепты хотя бы с одним из тегов: по маске tags_mask, а для тегов
+    за пределами маски — через таблицу связей."""
+    mask = get_tags_mask(tag_ids)
+    other_ids = [tag_id for tag_id in tag_ids if tag_id > TAGS_MASK_BITS]
+    condition = Q()
+    if mask:
+        condition |= Q(tags_match__gt=0)
+        queryset = queryset.alias(tags_match=F('tags_mask').bitand(mask))
+    if other_ids:
+        condition |= Q(Exists(Recipe.tags.through.objects.filter(
+            recipe=OuterRef('pk'), tag_id__in=other_ids
+        )))
+    if not condition:
+        return queryset.none()
+    return queryset.filter(condition)
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+
+def filter_recipes(queryset, params, user, tag_ids=None):
+    """Фильтры ленты; tag_ids — id тегов из ?tags= или None без фильтра."""
+    author = params.get('author')
+    search = params.get('search', '').strip()
+    if tag_ids is not None:
+        queryset = filter_by_tag_ids(queryset, tag_ids)
+    if author:
+        queryset = queryset.filter(author=author)
+    if user.is_authenticated:
+        if params.get('is_favorited') == '1':
+            queryset = queryset.filter(favorites__user=user)
+        if params.get('is_in_shopping_cart') == '1':
+            queryset = queryset.filter(shopping_cart__user=user)
+    if search:
+        queryset = search_recipes(queryset, search)
+    return queryset
+
+
+class IngredientViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
-    filter_backends = (DjangoFilterBackend,)
-    filterset_class = IngredientFilter
-    search_fields = ('^name',)
     pagination_class = None
 
+    def get_data_version(self):
+        return ingredient_index.checksum
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(self._search, request)
 
-class RecipeViewSet(viewsets.ModelViewSet):
+    def _search(self, request):
+        name = request.query_params.get('name', '')
+        if request.query_params.get('match') == 'fuzzy':
+            return Response(fuzzy_search_ingredients(name))
+        return Response(ingredient_index.search(name))
+
+
+class RecipeViewSet(AnonymousResponseCacheMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
     filter_backends = (DjangoFilterBackend,)
     permission_classes = [IsAuthorOrReadOnly]
     pagination_class = CustomPagination
+    response_cache_generation = RECIPES_GENERATION
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if 'cursor' in self.request.query_params:
+                self._paginator = RecipeCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def _reload(self, serializer):
+        """Перечитывает рецепт с prefetch, чтобы ответ не делал N+1."""
+        serializer.instance = self._annotate_queryset(
+            Recipe.objects.all()
+        ).get(pk=serializer.instance.pk)
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
+        self._reload(serializer)
 
-    def get_queryset(self):
-        queryset = Recipe.objects.prefetch_related('tags').all()
-        tags = self.request.query_params.getlist('tags')
-        author = self.request.query_params.get('author')
-        is_favorited = self.request.query_params.get('is_favorited')
-        is_in_shopping_cart = self.request.query_params.get(
-            'is_in_shopping_cart'
-        )
+    def perform_update(self, serializer):
+        serializer.save()
+        self._reload(serializer)
 
-        if tags:
-            queryset = queryset.filter(tags__slug__in=tags).distinct()
-        if author:
-            queryset = queryset.filter(author=author)
-        if is_favorited and self.request.user.is_authenticated:
-            if is_favorited == '1':
-                queryset = queryset.filter(favorites__user=self.request.user)
-        if is_in_shopping_cart and self.request.user.is_authenticated:
-            if is_in_shopping_cart == '1':
-                queryset = queryset.filter(
-                    shopping_cart__user=self.request.user
+    def _annotate_queryset(self, queryset):
+        user = self.request.user
+        queryset = prefetch_recipe_relations(queryset)
+        if not user.is_authenticated:
+            return queryset.select_related('author')
+        return queryset.prefetch_related(
+            Prefetch(
+                'author',
+                queryset=User.objects.annotate(
+                    is_subscribed=Exists(Subscription.objects.filter(
+                        user=user, author=OuterRef('pk')
+                    ))
                 )
-        return queryset
+            )
+        ).annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            )),
+            is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            )),
+        )
+
+    def get_queryset(self):
+        slugs = self.request.query_params.getlist('tags')
+        tag_ids = list(
+            Tag.objects.filter(slug__in=slugs).values_list('id', flat=True)
+        ) if slugs else None
+        return filter_recipes(
+            self._annotate_queryset(Recipe.objects.all()),
+            self.request.query_params, self.request.user, tag_ids
+        )
 
     def _handle_m2m_action(self, request, pk, model):
         user = request.user
@@ -66,13 +168,12 @@ class RecipeViewSet(viewsets.ModelViewSet):
         if request.method == 'POST':
             if obj.exists():
                 return Response(status=status.HTTP_400_BAD_REQUEST)
-            model.objects.create(user=user, recipe=recipe)
+            model.add(user, recipe)
             serializer = RecipeMinifiedSerializer(recipe)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        if not obj.exists():
+        if not model.remove(user, recipe):
             return Response(status=status.HTTP_400_BAD_REQUEST)
-        obj.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -81,8 +182,11 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_path='get-link'
     )
     def get_link(self, request, pk=None):
+        if not pk.isdigit():
+            raise Http404
+        code = encode(int(pk))
         return Response({
-            'short-link': f'http://{request.get_host()}/s/{pk}'
+            'short-link': f'http://{request.get_host()}/s/{code}/'
         })
 
     @action(
@@ -104,28 +208,98 @@ class RecipeViewSet(viewsets.ModelViewSet):
     @action(
         detail=False,
         methods=['get'],
-        permission_classes=[IsAuthenticated]
+        permission_classes=[IsAuthenticated],
+        content_negotiation_class=IgnoreClientContentNegotiation
     )
     def download_shopping_cart(self, request):
-        ingredients = RecipeIngredient.objects.filter(
-            recipe__shopping_cart__user=request.user
+        export_format = request.query_params.get('format', 'txt')
+        if export_format not in SHOPPING_LIST_FORMATS:
+            return Response(
+                {'format': [
+                    'Допустимые форматы: '
+                    + ', '.join(SHOPPING_LIST_FORMATS)
+                ]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        content_type, render = SHOPPING_LIST_FORMATS[export_format]
+
+        ingredients = ShoppingCartIngredient.objects.filter(
+            user=request.user
         ).values(
-            'ingredient__name',
-            'ingredient__measurement_unit'
-        ).annotate(
-            total_amount=Sum('amount')
-        ).order_by('ingredient__name')
-
-        shopping_list = [
-            f'{item["ingredient__name"]} '
-            f'({item["ingredient__measurement_unit"]}) - '
-            f'{item["total_amount"]}'
-            for item in ingredients
-        ]
-
-        response = HttpResponse(
-            'Список покупок:\n\n' + '\n'.join(shopping_list),
-            content_type='text/plain'
+            name=F('ingredient__name'),
+            measurement_unit=F('ingredient__measurement_unit'),
+            total_amount=F('amount')
+        ).order_by('name')
+
+        response = StreamingHttpResponse(
+            render(ingredients.iterator()),
+            content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename=shop_list.{export_format}'
         )
-        response['Content-Disposition'] = 'attachment; filename=shop_list.txt'
         return response
+
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[IsAuthenticated]
+    )
+    def shopping_cart_summary(self, request):
+        ingredients = ShoppingCartIngredient.objects.filter(
+            user=request.user
+        ).select_related('ingredient').order_by('ingredient__name')
+        serializer = ShoppingCartIngredientSerializer(ingredients, many=True)
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        permission_classes=[IsAuthenticated],
+        parser_classes=[JSONParser, NDJSONParser]
+    )
+    def bulk_import(self, request):
+        # JSON-массив разбирается целиком в памяти, большие загрузки
+        # принимаются только построчно (NDJSON).
+        if (
+            request.content_type.startswith('application/json')
+            and int(request.META.get('CONTENT_LENGTH') or 0)
+            > settings.RECIPE_IMPORT_JSON_MAX_SIZE
+        ):
+            return Response(
+                {'errors': [
+                    'JSON-массив больше '
+                    f'{settings.RECIPE_IMPORT_JSON_MAX_SIZE} байт, '
+                    'загрузите его как NDJSON'
+                ]},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        rows = request.data
+        if not isinstance(rows, (list, Iterator)):
+            return Response(
+                {'errors': ['Ожидался JSON-массив или NDJSON']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (
+            isinstance(rows, list)
+            and len(rows) > settings.RECIPE_IMPORT_MAX_ROWS
+        ):
+            return Response(
+                {'errors': [
+                    f'Не больше {settings.RECIPE_IMPORT_MAX_ROWS} рецептов '
+                    'за запрос'
+                ]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        created, errors = import_recipes(
+            rows, request.user, settings.RECIPE_IMPORT_BATCH_SIZE,
+            settings.RECIPE_IMPORT_MAX_ROWS
+        )
+        return Response(
+            {'created': created, 'errors': errors},
+            status=(
+                status.HTTP_201_CREATED if created
+                else status.HTTP_400_BAD_REQUEST
+            )
+        )
@@ -0,0 +1,11 @@
+from django.http import Http404, HttpResponseRedirect
+
+from api.shortlinks import hit_counter, resolve
+
+
+def short_link_redirect(request, code):
+    recipe_id = resolve(code)
+    if recipe_id is None:
+        raise Http404
+    hit_counter.hit(recipe_id)
+    return HttpResponseRedirect(f'/recipes/{recipe_id}/')
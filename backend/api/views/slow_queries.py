@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.shortcuts import render
+
+from api.slow_queries import recorder
+
+
+@staff_member_required
+def slow_queries(request):
+    return render(request, 'admin/slow_queries.html', {
+        **admin.site.each_context(request),
+        'title': 'Медленные SQL-запросы',
+        'records': list(reversed(recorder.records)),
+        'enabled': settings.SLOW_QUERY_LOG_ENABLED,
+        'threshold': settings.SLOW_QUERY_THRESHOLD_MS,
+    })
@@ -1,10 +1,14 @@
 from rest_framework import viewsets
 
 from tags.models import Tag
+from api.caching import ConditionalGetMixin, get_model_version
 from api.serializers.tags import TagSerializer
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
+
+    def get_data_version(self):
+        return get_model_version(Tag)
@@ -1,4 +1,6 @@
-from django.db.models import Count
+from django.db.models import (Count, Exists, F, OuterRef, Prefetch, Value,
+                              Window)
+from django.db.models.functions import RowNumber
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet
 from rest_framework import status
@@ -7,8 +9,10 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from recipes.models import Recipe
 from users.models import Subscription, User
-from api.serializers.users import AvatarSerializer, SubscriptionSerializer
+from api.serializers.users import (AvatarSerializer, SubscriptionSerializer,
+                                   get_recipes_limit)
 
 
 class AvatarView(APIView):
@@ -30,6 +34,17 @@ class AvatarView(APIView):
 
 
 class CustomUserViewSet(UserViewSet):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset
+        return queryset.annotate(
+            is_subscribed=Exists(Subscription.objects.filter(
+                user=user, author=OuterRef('pk')
+            ))
+        )
+
     @action(
         detail=True,
         methods=['post', 'delete'],
@@ -68,10 +83,23 @@ class CustomUserViewSet(UserViewSet):
     )
     def subscriptions(self, request):
         user = request.user
+        recipes = Recipe.objects.all()
+        recipes_limit = get_recipes_limit(request)
+        if recipes_limit:
+            recipes = recipes.annotate(
+                row_number=Window(
+                    RowNumber(),
+                    partition_by=F('author'),
+                    order_by=F('id').desc()
+                )
+            ).filter(row_number__lte=recipes_limit)
         queryset = User.objects.filter(
             subscribers__user=user
         ).annotate(
-            recipes_count=Count('recipes')
+            recipes_count=Count('recipes'),
+            is_subscribed=Value(True)
+        ).prefetch_related(
+            Prefetch('recipes', queryset=recipes)
         )
         pages = self.paginate_queryset(queryset)
         serializer = SubscriptionSerializer(
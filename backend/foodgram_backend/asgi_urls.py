@@ -0,0 +1,18 @@
+"""URL-схема ASGI-профиля.
+
+Async-версии горячих чтений стоят перед общими маршрутами; имена
+маршрутов и все остальные адреса берутся из foodgram_backend.urls.
+"""
+from django.urls import path
+
+from api.views.async_reads import (ingredient_list, recipe_detail,
+                                   recipe_list, short_link, tag_list)
+from foodgram_backend.urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/tags/', tag_list),
+    path('api/ingredients/', ingredient_list),
+    path('api/recipes/', recipe_list),
+    path('api/recipes/<int:pk>/', recipe_detail),
+    path('s/<str:code>/', short_link),
+] + sync_urlpatterns
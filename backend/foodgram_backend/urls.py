@@ -3,8 +3,14 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from api.views.metrics import metrics
+from api.views.shortlinks import short_link_redirect
+from api.views.slow_queries import slow_queries
 
 urlpatterns = [
+    path('admin/slow-queries/', slow_queries, name='slow-queries'),
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    path('s/<str:code>/', short_link_redirect, name='short-link'),
+    path('metrics', metrics, name='metrics'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,44 @@
+"""Настройки gunicorn.
+
+SERVER_PROFILE=wsgi (по умолчанию) — синхронные воркеры и обычные
+представления, SERVER_PROFILE=asgi — воркеры uvicorn и async-версии
+горячих чтений (foodgram_backend.asgi_urls). Приложение загружается
+в мастере до запуска воркеров (preload_app).
+
+Воркеры делят счётчики поколений и кеши через общий кеш Django (Redis
+из REDIS_URL), поэтому без него по умолчанию запускается один воркер,
+а GUNICORN_WORKERS больше 1 с кешем в памяти процесса — ошибка запуска.
+"""
+import os
+
+SERVER_PROFILES = {
+    'wsgi': ('foodgram_backend.wsgi:application', 'sync'),
+    'asgi': (
+        'foodgram_backend.asgi:application', 'uvicorn_worker.UvicornWorker'
+    ),
+}
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+wsgi_app, worker_class = SERVER_PROFILES[os.getenv('SERVER_PROFILE', 'wsgi')]
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(
+    os.getenv('GUNICORN_WORKERS', 4 if os.getenv('REDIS_URL') else 1)
+)
+preload_app = True
+
+
+def on_starting(server):
+    from django.conf import settings
+
+    from api.metrics import clear
+
+    backend = settings.CACHES['default']['BACKEND']
+    if server.cfg.workers > 1 and backend in PROCESS_LOCAL_CACHES:
+        raise RuntimeError(
+            f'{server.cfg.workers} воркеров требуют общего кеша, '
+            f'а настроен {backend}: задайте REDIS_URL или GUNICORN_WORKERS=1'
+        )
+    clear()
@@ -6,6 +6,7 @@ from .models import (
     Recipe,
     RecipeIngredient,
     ShoppingCart,
+    ShoppingCartIngredient,
     Favorite,
 )
 
@@ -34,6 +35,8 @@ class RecipeAdmin(admin.ModelAdmin):
     favorites_count.short_description = 'В избранном'
 
 
-other_models = [RecipeIngredient, ShoppingCart, Favorite]
+other_models = [
+    RecipeIngredient, ShoppingCart, ShoppingCartIngredient, Favorite
+]
 for model in other_models:
     admin.site.register(model)
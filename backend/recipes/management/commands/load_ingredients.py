@@ -0,0 +1,109 @@
+import csv
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.models import Ingredient
+from recipes.search import ingredient_index
+
+DEFAULT_PATH = settings.BASE_DIR.parent / 'data' / 'ingredients.csv'
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def read_csv(file):
+    """Пары (название, единица); в коротких строках недостающее пусто."""
+    for row in csv.reader(file):
+        if any(field.strip() for field in row):
+            name, measurement_unit, *_ = row + ['', '']
+            yield name, measurement_unit
+
+
+def read_json(file):
+    """Построчно разбирает JSON-массив объектов, не загружая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    while True:
+        chunk = file.read(READ_CHUNK_SIZE)
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if not started and buffer[position:position + 1] == '[':
+                started = True
+                position += 1
+                continue
+            if buffer[position:position + 1] == ']':
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            yield item.get('name', ''), item.get('measurement_unit', '')
+        if not chunk:
+            if buffer[position:].strip():
+                raise CommandError('Некорректный JSON')
+            return
+
+
+READERS = {
+    '.csv': read_csv,
+    '.json': read_json,
+}
+
+
+class Command(BaseCommand):
+    help = 'Загружает справочник ингредиентов из CSV или JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=DEFAULT_PATH)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        reader = READERS.get(path.suffix.lower())
+        if reader is None:
+            raise CommandError(
+                'Поддерживаются файлы: ' + ', '.join(READERS)
+            )
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+        total = 0
+        skipped = 0
+        created_before = Ingredient.objects.count()
+        batch = []
+        with open(path, encoding='utf-8') as file:
+            for name, measurement_unit in reader(file):
+                name, measurement_unit = name.strip(), measurement_unit.strip()
+                if not name or not measurement_unit:
+                    skipped += 1
+                    continue
+                batch.append(Ingredient(
+                    name=name, measurement_unit=measurement_unit
+                ))
+                if len(batch) >= batch_size:
+                    total += self._save(batch)
+                    batch = []
+        total += self._save(batch)
+        ingredient_index.invalidate()
+
+        elapsed = time.perf_counter() - started
+        created = Ingredient.objects.count() - created_before
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано {total} строк, добавлено {created} ингредиентов '
+            f'за {elapsed:.2f} с ({total / max(elapsed, 1e-6):.0f} строк/с)'
+        ))
+        if skipped:
+            self.stderr.write(self.style.WARNING(
+                f'Пропущено {skipped} строк без названия или единицы '
+                f'измерения'
+            ))
+
+    def _save(self, batch):
+        Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+        return len(batch)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import ShoppingCartIngredient
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает итоги списков покупок с нуля'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        ShoppingCartIngredient.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            'Итоги списков покупок пересчитаны: '
+            f'{ShoppingCartIngredient.objects.count()} строк'
+        ))
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.16 on 2026-10-18 04:01
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_rows(model, owner, keep_id, duplicate_ids):
+    """Переводит строки model на keep_id, складывая количества строк
+    одного владельца, чтобы не нарушить уникальность (owner, ingredient)."""
+    groups = defaultdict(list)
+    for item in model.objects.filter(
+        ingredient_id__in=[keep_id, *duplicate_ids]
+    ).order_by('id'):
+        groups[getattr(item, owner)].append(item)
+    for items in groups.values():
+        items.sort(key=lambda item: item.ingredient_id != keep_id)
+        target, *rest = items
+        model.objects.filter(id__in=[item.id for item in rest]).delete()
+        target.ingredient_id = keep_id
+        target.amount = sum(item.amount for item in items)
+        target.save(update_fields=['ingredient', 'amount'])
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    """Оставляет у каждой пары (name, measurement_unit) строку
+    с наименьшим id и переносит на неё ссылки дубликатов."""
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    ShoppingCartIngredient = apps.get_model(
+        'recipes', 'ShoppingCartIngredient'
+    )
+    duplicates = Ingredient.objects.values(
+        'name', 'measurement_unit'
+    ).annotate(
+        count=Count('id'), keep_id=Min('id')
+    ).filter(count__gt=1).order_by()
+    for row in duplicates:
+        duplicate_ids = list(Ingredient.objects.filter(
+            name=row['name'], measurement_unit=row['measurement_unit']
+        ).exclude(id=row['keep_id']).values_list('id', flat=True))
+        merge_rows(RecipeIngredient, 'recipe_id', row['keep_id'],
+                   duplicate_ids)
+        merge_rows(ShoppingCartIngredient, 'user_id', row['keep_id'],
+                   duplicate_ids)
+        Ingredient.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_shoppingcartingredient'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_ingredients, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_ingredient'),
+        ),
+    ]
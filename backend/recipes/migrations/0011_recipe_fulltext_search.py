@@ -0,0 +1,68 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = (
+    "ALTER TABLE recipes_recipe ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(text, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX recipes_recipe_search_vector ON recipes_recipe "
+    "USING GIN (search_vector)",
+)
+POSTGRES_BACKWARD = (
+    "ALTER TABLE recipes_recipe DROP COLUMN search_vector",
+)
+SQLITE_FORWARD = (
+    "CREATE VIRTUAL TABLE recipes_recipe_fts USING fts5("
+    "name, text, content='recipes_recipe', content_rowid='id', "
+    "tokenize='unicode61')",
+    "CREATE TRIGGER recipes_recipe_fts_insert AFTER INSERT ON recipes_recipe "
+    "BEGIN INSERT INTO recipes_recipe_fts(rowid, name, text) "
+    "VALUES (new.id, new.name, new.text); END",
+    "CREATE TRIGGER recipes_recipe_fts_delete AFTER DELETE ON recipes_recipe "
+    "BEGIN INSERT INTO recipes_recipe_fts(recipes_recipe_fts, rowid, name, "
+    "text) VALUES ('delete', old.id, old.name, old.text); END",
+    "CREATE TRIGGER recipes_recipe_fts_update AFTER UPDATE OF name, text "
+    "ON recipes_recipe BEGIN "
+    "INSERT INTO recipes_recipe_fts(recipes_recipe_fts, rowid, name, text) "
+    "VALUES ('delete', old.id, old.name, old.text); "
+    "INSERT INTO recipes_recipe_fts(rowid, name, text) "
+    "VALUES (new.id, new.name, new.text); END",
+    "INSERT INTO recipes_recipe_fts(recipes_recipe_fts) VALUES ('rebuild')",
+)
+SQLITE_BACKWARD = (
+    "DROP TRIGGER recipes_recipe_fts_insert",
+    "DROP TRIGGER recipes_recipe_fts_delete",
+    "DROP TRIGGER recipes_recipe_fts_update",
+    "DROP TABLE recipes_recipe_fts",
+)
+
+
+def run(statements, schema_editor):
+    for statement in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def forward(apps, schema_editor):
+    run(
+        {'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD},
+        schema_editor
+    )
+
+
+def backward(apps, schema_editor):
+    run(
+        {'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD},
+        schema_editor
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_short_link_hits'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, backward),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def forward(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX recipes_ingredient_name_trgm ON recipes_ingredient '
+        'USING GIN (name gin_trgm_ops)'
+    )
+
+
+def backward(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX recipes_ingredient_name_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_recipe_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, backward),
+    ]
@@ -0,0 +1,69 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = (
+    "CREATE TABLE recipes_ingredient_version "
+    "(id integer PRIMARY KEY, version bigint NOT NULL)",
+    "INSERT INTO recipes_ingredient_version VALUES (1, 0)",
+    "CREATE FUNCTION recipes_ingredient_bump_version() RETURNS trigger AS $$ "
+    "BEGIN UPDATE recipes_ingredient_version SET version = version + 1 "
+    "WHERE id = 1; RETURN NULL; END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER recipes_ingredient_version "
+    "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON recipes_ingredient "
+    "FOR EACH STATEMENT EXECUTE FUNCTION recipes_ingredient_bump_version()",
+)
+POSTGRES_BACKWARD = (
+    "DROP TRIGGER recipes_ingredient_version ON recipes_ingredient",
+    "DROP FUNCTION recipes_ingredient_bump_version()",
+    "DROP TABLE recipes_ingredient_version",
+)
+SQLITE_BUMP = (
+    "BEGIN UPDATE recipes_ingredient_version SET version = version + 1 "
+    "WHERE id = 1; END"
+)
+SQLITE_FORWARD = (
+    "CREATE TABLE recipes_ingredient_version "
+    "(id integer PRIMARY KEY, version bigint NOT NULL)",
+    "INSERT INTO recipes_ingredient_version VALUES (1, 0)",
+    *(
+        f"CREATE TRIGGER recipes_ingredient_version_{event.lower()} "
+        f"AFTER {event} ON recipes_ingredient {SQLITE_BUMP}"
+        for event in ('INSERT', 'UPDATE', 'DELETE')
+    ),
+)
+SQLITE_BACKWARD = (
+    *(
+        f"DROP TRIGGER recipes_ingredient_version_{event}"
+        for event in ('insert', 'update', 'delete')
+    ),
+    "DROP TABLE recipes_ingredient_version",
+)
+
+
+def run(statements, schema_editor):
+    for statement in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def forward(apps, schema_editor):
+    run(
+        {'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD},
+        schema_editor
+    )
+
+
+def backward(apps, schema_editor):
+    run(
+        {'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD},
+        schema_editor
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_ingredient_name_trigram_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, backward),
+    ]
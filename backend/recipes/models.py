@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Sum
 
 from tags.models import Tag
 
@@ -12,6 +13,20 @@ CHAR_FIELD_SMALL_LENGTH = 64
 CHAR_FIELD_LONG_LENGTH = 256
 MIN_AMOUNT = 1
 MAX_AMOUNT = 32_000
+TAGS_MASK_BITS = 63
+
+
+def get_tags_mask(tag_ids):
+    """Битовая маска тегов: тегу с id n соответствует бит n - 1.
+
+    В маску попадают только теги с id до TAGS_MASK_BITS, остальные
+    ищутся через таблицу связей.
+    """
+    mask = 0
+    for tag_id in tag_ids:
+        if tag_id <= TAGS_MASK_BITS:
+            mask |= 1 << (tag_id - 1)
+    return mask
 
 
 class ValidatedPositiveSmallIntegerField(models.PositiveSmallIntegerField):
@@ -37,6 +52,12 @@ class Ingredient(models.Model):
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
         ordering = ('name',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'measurement_unit'],
+                name='unique_ingredient'
+            )
+        ]
 
     def __str__(self):
         return f'{self.name}, {self.measurement_unit}'
@@ -71,6 +92,21 @@ class Recipe(models.Model):
     cooking_time = ValidatedPositiveSmallIntegerField(
         verbose_name='Время приготовления'
     )
+    image_renditions = models.JSONField(
+        default=dict,
+        editable=False,
+        verbose_name='Уменьшенные копии изображения'
+    )
+    short_link_hits = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Переходы по короткой ссылке'
+    )
+    tags_mask = models.BigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Маска тегов'
+    )
 
     class Meta:
         verbose_name = 'Рецепт'
@@ -81,6 +117,23 @@ class Recipe(models.Model):
     def __str__(self):
         return self.name
 
+    def update_tags_mask(self):
+        self.tags_mask = get_tags_mask(
+            self.tags.values_list('id', flat=True)
+        )
+        Recipe.objects.filter(pk=self.pk).update(tags_mask=self.tags_mask)
+
+    def get_ingredient_amounts(self):
+        return get_ingredient_amounts(self.pk)
+
+
+def get_ingredient_amounts(recipe_id):
+    return dict(
+        RecipeIngredient.objects.filter(recipe_id=recipe_id).values_list(
+            'ingredient_id', 'amount'
+        )
+    )
+
 
 class RecipeIngredient(models.Model):
     recipe = models.ForeignKey(
@@ -131,6 +184,16 @@ class UserRecipeBaseModel(models.Model):
     def __str__(self):
         return f'{self.user} {self.recipe}'
 
+    @classmethod
+    def add(cls, user, recipe):
+        return cls.objects.create(user=user, recipe=recipe)
+
+    @classmethod
+    def remove(cls, user, recipe):
+        """Удаляет связь и сообщает, была ли она."""
+        deleted, _ = cls.objects.filter(user=user, recipe=recipe).delete()
+        return deleted > 0
+
 
 class Favorite(UserRecipeBaseModel):
     class Meta:
@@ -157,3 +220,113 @@ class ShoppingCart(UserRecipeBaseModel):
                 name='unique_shopping_cart'
             )
         ]
+
+    @classmethod
+    @transaction.atomic
+    def add(cls, user, recipe):
+        """Итоги списка увеличивает сигнал post_save в той же транзакции."""
+        return super().add(user, recipe)
+
+    @classmethod
+    @transaction.atomic
+    def remove(cls, user, recipe):
+        """Итоги уменьшает сигнал pre_delete.
+
+        Строка блокируется до удаления, поэтому повторный или параллельный
+        вызов ничего не найдёт и не вычтет количества ещё раз.
+        """
+        item = cls.objects.select_for_update().filter(
+            user=user, recipe=recipe
+        ).first()
+        if item is None:
+            return False
+        item.delete()
+        return True
+
+
+class ShoppingCartIngredient(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Пользователь',
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        verbose_name='Ингредиент',
+    )
+    amount = models.PositiveIntegerField(
+        verbose_name='Количество'
+    )
+
+    class Meta:
+        verbose_name = 'Ингредиент в списке покупок'
+        verbose_name_plural = 'Ингредиенты в списках покупок'
+        default_related_name = 'shopping_cart_ingredients'
+        ordering = ('id',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_shopping_cart_ingredient'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user} {self.ingredient} {self.amount}'
+
+    @classmethod
+    @transaction.atomic(savepoint=False)
+    def apply_deltas(cls, user_ids, deltas):
+        """Прибавляет к итогам пользователей deltas {ingredient_id: amount}.
+
+        Строки, у которых количество стало нулевым, удаляются.
+        """
+        deltas = {key: value for key, value in deltas.items() if value}
+        if not user_ids or not deltas:
+            return
+        found = set()
+        to_update = []
+        to_delete = []
+        for item in cls.objects.select_for_update().filter(
+            user_id__in=user_ids, ingredient_id__in=deltas
+        ):
+            found.add((item.user_id, item.ingredient_id))
+            item.amount += deltas[item.ingredient_id]
+            if item.amount > 0:
+                to_update.append(item)
+            else:
+                to_delete.append(item.id)
+        if to_update:
+            cls.objects.bulk_update(to_update, ['amount'])
+        if to_delete:
+            cls.objects.filter(id__in=to_delete).delete()
+        cls.objects.bulk_create([
+            cls(user_id=user_id, ingredient_id=ingredient_id, amount=amount)
+            for user_id in user_ids
+            for ingredient_id, amount in deltas.items()
+            if amount > 0 and (user_id, ingredient_id) not in found
+        ])
+
+    @classmethod
+    @transaction.atomic
+    def rebuild(cls, batch_size=1000):
+        """Пересчитывает итоги всех списков покупок с нуля."""
+        cls.objects.all().delete()
+        totals = RecipeIngredient.objects.values(
+            'ingredient_id', user_id=F('recipe__shopping_cart__user')
+        ).filter(
+            user_id__isnull=False
+        ).annotate(
+            total_amount=Sum('amount')
+        ).order_by()
+        batch = []
+        for row in totals.iterator():
+            batch.append(cls(
+                user_id=row['user_id'],
+                ingredient_id=row['ingredient_id'],
+                amount=row['total_amount'],
+            ))
+            if len(batch) >= batch_size:
+                cls.objects.bulk_create(batch)
+                batch = []
+        cls.objects.bulk_create(batch)
@@ -0,0 +1,301 @@
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from hashlib import md5
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+from recipes.models import Ingredient
+
+WORD_RE = re.compile(r'\w+')
+INGREDIENT_VERSION_QUERY = 'SELECT version FROM recipes_ingredient_version'
+POSTGRES_INGREDIENT_FUZZY_SEARCH = '''
+    SELECT id, name, measurement_unit FROM (
+        SELECT id, name, measurement_unit,
+            CASE
+                WHEN lower(name) LIKE %(prefix)s THEN 0
+                WHEN lower(name) LIKE %(word_start)s THEN 1
+                WHEN lower(name) LIKE %(substring)s THEN 2
+                ELSE 3
+            END AS match_rank,
+            similarity(name, %(query)s) AS similarity
+        FROM recipes_ingredient
+        WHERE name ILIKE %(substring)s OR name %% %(query)s
+    ) AS matches
+    ORDER BY match_rank, similarity DESC, name
+    LIMIT %(limit)s
+'''
+
+
+def get_trigrams(text):
+    """Триграммы слов строки, дополненных пробелами, как в pg_trgm."""
+    trigrams = set()
+    for word in WORD_RE.findall(text.lower()):
+        padded = f'  {word} '
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def get_match_rank(name, query, word_start):
+    """0 — префикс, 1 — начало слова, 2 — подстрока, None — иначе."""
+    if name.startswith(query):
+        return 0
+    if word_start.search(name):
+        return 1
+    if query in name:
+        return 2
+    return None
+
+
+class IngredientPrefixIndex:
+    """Индекс названий ингредиентов в памяти процесса.
+
+    Хранит отсортированный массив названий, поиск по префиксу занимает
+    O(log n + k). Для нечёткого поиска хранятся триграммы названий
+    и списки позиций по каждой триграмме. Индекс перестраивается после
+    подтверждённых изменений ингредиентов в этом процессе (сигналы)
+    и после любых других изменений таблицы: триггер увеличивает версию
+    в recipes_ingredient_version при каждой записи, версия проверяется
+    не чаще раза в INGREDIENT_INDEX_CHECK_INTERVAL секунд.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = ([], [], [], {})
+        self._version = None
+        self._checksum = None
+        self._checked_at = 0.0
+        self._stale = True
+
+    def invalidate(self):
+        self._stale = True
+
+    def _get_version(self):
+        with connection.cursor() as cursor:
+            cursor.execute(INGREDIENT_VERSION_QUERY)
+            return cursor.fetchone()[0]
+
+    def _build(self, version):
+        rows = sorted(
+            Ingredient.objects.values_list('name', 'id', 'measurement_unit')
+        )
+        trigrams = [get_trigrams(name) for name, _, _ in rows]
+        postings = defaultdict(list)
+        for position, name_trigrams in enumerate(trigrams):
+            for trigram in name_trigrams:
+                postings[trigram].append(position)
+        self._index = (
+            [name for name, _, _ in rows],
+            [
+                {'id': pk, 'name': name, 'measurement_unit': unit}
+                for name, pk, unit in rows
+            ],
+            trigrams,
+            dict(postings),
+        )
+        self._version = version
+        self._checksum = md5(repr(rows).encode()).hexdigest()
+
+    def _is_fresh(self):
+        return not self._stale and (
+            time.monotonic() - self._checked_at
+            < settings.INGREDIENT_INDEX_CHECK_INTERVAL
+        )
+
+    def _refresh(self):
+        if self._is_fresh():
+            return
+        with self._lock:
+            if self._is_fresh():
+                return
+            stale, self._stale = self._stale, False
+            version = self._get_version()
+            if stale or version != self._version:
+                self._build(version)
+            self._checked_at = time.monotonic()
+
+    async def _arefresh(self):
+        """Обращается к БД из async-кода, только если индекс устарел."""
+        if not self._is_fresh():
+            await sync_to_async(self._refresh)()
+
+    @property
+    def checksum(self):
+        """Контрольная сумма содержимого индекса для ETag."""
+        self._refresh()
+        return self._checksum
+
+    async def achecksum(self):
+        await self._arefresh()
+        return self._checksum
+
+    def search(self, prefix='', limit=None):
+        self._refresh()
+        return self._search(prefix, limit)
+
+    async def asearch(self, prefix='', limit=None):
+        await self._arefresh()
+        return self._search(prefix, limit)
+
+    def fuzzy_search(self, query, limit=None):
+        self._refresh()
+        return self._fuzzy_search(query, limit)
+
+    async def afuzzy_search(self, query, limit=None):
+        await self._arefresh()
+        return self._fuzzy_search(query, limit)
+
+    def _search(self, prefix='', limit=None):
+        """Ингредиенты, название которых начинается с prefix.
+
+        Точные совпадения идут первыми: в отсортированном массиве
+        строка, равная префиксу, всегда стоит раньше своих продолжений.
+        """
+        if limit is None:
+            limit = settings.INGREDIENT_SEARCH_LIMIT
+        names, items, _, _ = self._index
+        result = []
+        index = bisect_left(names, prefix)
+        while (
+            index < len(names)
+            and len(result) < limit
+            and names[index].startswith(prefix)
+        ):
+            result.append(items[index])
+            index += 1
+        return result
+
+    def _fuzzy_search(self, query, limit=None):
+        """Ингредиенты, содержащие query или похожие на него.
+
+        Кандидаты находятся по общим триграммам; короткие запросы,
+        у которых может не быть общих триграмм с названием, проверяются
+        перебором. Порядок: префикс, начало слова, подстрока, затем
+        похожие по триграммам не ниже INGREDIENT_FUZZY_THRESHOLD.
+        """
+        if limit is None:
+            limit = settings.INGREDIENT_SEARCH_LIMIT
+        query = query.lower().strip()
+        if not query:
+            return self._search('', limit)
+        names, items, trigrams, postings = self._index
+        query_trigrams = get_trigrams(query)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(postings.get(trigram, ()))
+        candidates = range(len(names)) if len(query) < 3 else shared
+        word_start = re.compile(rf'(?<!\w){re.escape(query)}')
+        matches = []
+        for position in candidates:
+            name = names[position].lower()
+            common = shared[position]
+            similarity = common / (
+                len(query_trigrams) + len(trigrams[position]) - common
+            ) if common else 0.0
+            rank = get_match_rank(name, query, word_start)
+            if rank is None:
+                if similarity < settings.INGREDIENT_FUZZY_THRESHOLD:
+                    continue
+                rank = 3
+            matches.append((rank, -similarity, names[position], position))
+        return [
+            items[match[-1]] for match in heapq.nsmallest(limit, matches)
+        ]
+
+
+ingredient_index = IngredientPrefixIndex()
+
+
+def escape_like(value):
+    return (
+        value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    )
+
+
+def fuzzy_search_ingredients(query, limit=None):
+    """Нечёткий поиск ингредиентов: pg_trgm на PostgreSQL, иначе индекс
+    в памяти процесса."""
+    if connection.vendor != 'postgresql':
+        return ingredient_index.fuzzy_search(query, limit)
+    if limit is None:
+        limit = settings.INGREDIENT_SEARCH_LIMIT
+    query = query.lower().strip()
+    if not query:
+        return ingredient_index.search('', limit)
+    pattern = escape_like(query)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT set_limit(%s)', [settings.INGREDIENT_FUZZY_THRESHOLD]
+        )
+        cursor.execute(POSTGRES_INGREDIENT_FUZZY_SEARCH, {
+            'query': query,
+            'prefix': f'{pattern}%',
+            'word_start': f'% {pattern}%',
+            'substring': f'%{pattern}%',
+            'limit': limit,
+        })
+        return [
+            {'id': pk, 'name': name, 'measurement_unit': unit}
+            for pk, name, unit in cursor.fetchall()
+        ]
+
+
+async def afuzzy_search_ingredients(query, limit=None):
+    """Async-вариант: у сырых курсоров нет async API, поэтому запрос
+    к PostgreSQL выполняется в потоке."""
+    if connection.vendor != 'postgresql':
+        return await ingredient_index.afuzzy_search(query, limit)
+    return await sync_to_async(fuzzy_search_ingredients)(query, limit)
+
+
+POSTGRES_RECIPE_RANK = (
+    "ts_rank(recipes_recipe.search_vector, "
+    "websearch_to_tsquery('russian', %s))"
+)
+POSTGRES_RECIPE_MATCH = (
+    "SELECT id FROM recipes_recipe "
+    "WHERE search_vector @@ websearch_to_tsquery('russian', %s)"
+)
+SQLITE_RECIPE_RANK = (
+    "SELECT -bm25(recipes_recipe_fts, 10.0, 1.0) FROM recipes_recipe_fts "
+    "WHERE recipes_recipe_fts MATCH %s "
+    "AND recipes_recipe_fts.rowid = recipes_recipe.id"
+)
+SQLITE_RECIPE_MATCH = (
+    "SELECT rowid FROM recipes_recipe_fts WHERE recipes_recipe_fts MATCH %s"
+)
+
+
+def get_fts5_query(text):
+    """Все слова запроса как префиксы, кавычки экранируются."""
+    return ' '.join(
+        '"{}"*'.format(word.replace('"', '""')) for word in text.split()
+    )
+
+
+def search_recipes(queryset, text):
+    """Полнотекстовый поиск по названию и описанию рецепта.
+
+    На PostgreSQL используется генерируемая колонка tsvector с GIN-индексом,
+    на SQLite — таблица FTS5, которую поддерживают триггеры. Название
+    весит больше описания, результаты отсортированы по релевантности.
+    """
+    if connection.vendor == 'postgresql':
+        rank, match, params = (
+            POSTGRES_RECIPE_RANK, POSTGRES_RECIPE_MATCH, [text]
+        )
+    else:
+        query = get_fts5_query(text)
+        if not query:
+            return queryset
+        rank, match, params = SQLITE_RECIPE_RANK, SQLITE_RECIPE_MATCH, [query]
+    return queryset.filter(id__in=RawSQL(match, params)).alias(
+        search_rank=RawSQL(rank, params, output_field=FloatField())
+    ).order_by('-search_rank', '-id')
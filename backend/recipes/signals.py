@@ -0,0 +1,115 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, QuerySet
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from recipes.models import (Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, ShoppingCartIngredient, User,
+                            get_ingredient_amounts, get_tags_mask)
+from recipes.search import ingredient_index
+from tags.models import Tag
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredient_index(**kwargs):
+    # Иначе индекс может перестроиться по данным, которые откатятся.
+    transaction.on_commit(ingredient_index.invalidate)
+
+
+def remove_tag_from_masks(tag):
+    bit = get_tags_mask([tag.id])
+    if bit:
+        Recipe.objects.filter(tags=tag).update(
+            tags_mask=F('tags_mask').bitand(~bit)
+        )
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def update_tags_mask(instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            instance.update_tags_mask()
+        return
+    if action == 'pre_clear':
+        remove_tag_from_masks(instance)
+    elif action in ('post_add', 'post_remove'):
+        for recipe in Recipe.objects.filter(pk__in=pk_set):
+            recipe.update_tags_mask()
+
+
+@receiver(pre_delete, sender=Tag)
+def remove_deleted_tag_from_masks(instance, **kwargs):
+    remove_tag_from_masks(instance)
+
+
+def get_cart_user_ids(recipe_id):
+    return list(
+        ShoppingCart.objects.filter(recipe_id=recipe_id).values_list(
+            'user_id', flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=ShoppingCart)
+def add_recipe_to_cart_totals(instance, created, raw=False, **kwargs):
+    if created and not raw:
+        ShoppingCartIngredient.apply_deltas(
+            [instance.user_id], get_ingredient_amounts(instance.recipe_id)
+        )
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def remove_recipe_from_cart_totals(instance, origin, **kwargs):
+    """Срабатывает и при каскадном удалении рецепта или его автора:
+    pre_delete приходит, пока ингредиенты рецепта ещё на месте."""
+    if isinstance(origin, User) and origin.pk == instance.user_id:
+        return
+    ShoppingCartIngredient.apply_deltas([instance.user_id], {
+        ingredient_id: -amount
+        for ingredient_id, amount
+        in get_ingredient_amounts(instance.recipe_id).items()
+    })
+
+
+@receiver(pre_save, sender=RecipeIngredient)
+def remember_recipe_ingredient(instance, raw=False, **kwargs):
+    instance.previous = None
+    if instance.pk and not raw:
+        instance.previous = RecipeIngredient.objects.filter(
+            pk=instance.pk
+        ).values_list('ingredient_id', 'amount').first()
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def update_cart_totals_on_save(instance, raw=False, **kwargs):
+    """Правки ингредиентов через .save() (например, в админке).
+
+    Массовые bulk_create и bulk_update сигналов не посылают, их итоги
+    пересчитывает вызывающий код.
+    """
+    if raw:
+        return
+    deltas = defaultdict(int, {instance.ingredient_id: instance.amount})
+    if instance.previous:
+        ingredient_id, amount = instance.previous
+        deltas[ingredient_id] -= amount
+    ShoppingCartIngredient.apply_deltas(
+        get_cart_user_ids(instance.recipe_id), deltas
+    )
+
+
+@receiver(pre_delete, sender=RecipeIngredient)
+def update_cart_totals_on_delete(instance, origin, **kwargs):
+    """Только прямое удаление строки: при удалении рецепта итоги
+    уменьшает сигнал ShoppingCart, при удалении ингредиента строки
+    итогов удаляются каскадом."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if model is not RecipeIngredient:
+        return
+    ShoppingCartIngredient.apply_deltas(
+        get_cart_user_ids(instance.recipe_id),
+        {instance.ingredient_id: -instance.amount}
+    )
@@ -0,0 +1,76 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from recipes.models import Ingredient
+
+ROWS = [
+    ('абрикосы', 'г'),
+    ('вода', 'мл'),
+    ('вода', 'стакан'),
+    ('соль', 'по вкусу'),
+]
+
+
+class LoadIngredientsTest(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def write(self, name, content):
+        path = self.directory / name
+        path.write_text(content, encoding='utf-8')
+        return str(path)
+
+    def load(self, path, **options):
+        call_command('load_ingredients', path, stdout=StringIO(), **options)
+        return set(
+            Ingredient.objects.values_list('name', 'measurement_unit')
+        )
+
+    def test_csv_is_idempotent(self):
+        path = self.write(
+            'ingredients.csv',
+            ''.join(f'{name},{unit}\n' for name, unit in ROWS)
+        )
+        self.assertEqual(self.load(path, batch_size=3), set(ROWS))
+        self.assertEqual(self.load(path, batch_size=3), set(ROWS))
+        self.assertEqual(Ingredient.objects.count(), len(ROWS))
+
+    def test_short_and_blank_rows_are_skipped(self):
+        path = self.write(
+            'ingredients.csv',
+            'абрикосы,г\n\n,\nвода\nсоль, \nвода,мл,лишнее\n'
+        )
+        stderr = StringIO()
+        call_command(
+            'load_ingredients', path, stdout=StringIO(), stderr=stderr
+        )
+        self.assertEqual(
+            set(Ingredient.objects.values_list('name', 'measurement_unit')),
+            {('абрикосы', 'г'), ('вода', 'мл')}
+        )
+        self.assertIn('Пропущено 2 строк', stderr.getvalue())
+
+    @mock.patch(
+        'recipes.management.commands.load_ingredients.READ_CHUNK_SIZE', 7
+    )
+    def test_json_streamed_in_chunks(self):
+        path = self.write('ingredients.json', json.dumps([
+            {'name': name, 'measurement_unit': unit} for name, unit in ROWS
+        ], ensure_ascii=False, indent=2))
+        self.assertEqual(self.load(path, batch_size=2), set(ROWS))
+
+    def test_empty_json(self):
+        self.assertEqual(self.load(self.write('empty.json', '[]')), set())
+
+    def test_unsupported_format(self):
+        with self.assertRaises(CommandError):
+            self.load(self.write('ingredients.xml', ''))
@@ -11,6 +11,10 @@ class User(AbstractUser):
         null=True,
         blank=True,
     )
+    avatar_renditions = models.JSONField(
+        default=dict,
+        editable=False,
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']